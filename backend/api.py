@@ -34,8 +34,11 @@ ALLOWED_CSV_TYPES = {'.csv'}
 # Initialize analysis service
 analysis_service = AnalysisService()
 
-# Thread pool for parallel execution
-executor = ThreadPoolExecutor(max_workers=4)
+# Thread pool for parallel execution. The analysis fans out ~34 independent
+# table-reading services per upload; pandas releases the GIL while parsing, so
+# more than four workers overlaps usefully.
+MAX_WORKERS = int(os.getenv("MAX_WORKERS", str(min(8, os.cpu_count() or 4))))
+executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="analysis")
 
 
 def validate_file_size(file: UploadFile) -> None:
@@ -4,24 +4,32 @@ from __future__ import annotations
 
 import asyncio
 import datetime
+import functools
+import itertools
+import json
 import logging
 import math
 import numbers
 from concurrent.futures import ThreadPoolExecutor
 import os
+import re
+import tempfile
 import threading
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from .health_score import calculate_health_score, health_report_to_dict
 
+import numpy as np
 import pandas as pd
 
 from .anomalies import (
     IBH_ANOMALY_AGG_COL,
     IBH_ANOMALY_AGG_WEIGHT,
     IBH_ANOMALY_TBL_KEY,
+    COLUMN_TO_ANOMALY,
     AnomlyType,
 )
 from .ar_info_service import ArInfoService
@@ -30,6 +38,7 @@ from .brief_service import BriefService
 from .buffer_histogram_service import BufferHistogramService
 from .cable_service import CableService
 from .credit_watchdog_service import CreditWatchdogService
+from .dataset_inventory import DatasetInventory
 from .extended_node_info_service import ExtendedNodeInfoService
 from .extended_port_info_service import ExtendedPortInfoService
 from .extended_switch_info_service import ExtendedSwitchInfoService
@@ -37,7 +46,7 @@ from .fan_service import FanService
 from .fec_mode_service import FecModeService
 from .hca_service import HcaService
 from .histogram_service import HistogramService
-from .ibdiagnet import read_index_table, read_table
+from .ibdiagnet import read_table
 from .link_oscillation_service import LinkOscillationService
 from .mlnx_counters_service import MlnxCountersService
 from .n2n_security_service import N2NSecurityService
@@ -65,6 +74,148 @@ logger = logging.getLogger(__name__)
 
 MAX_PREVIEW_ROWS: Optional[int] = None
 
+
+def _preview_all(records: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    return records
+
+
+def _preview_head(records: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    if not records or len(records) <= MAX_PREVIEW_ROWS:
+        return records
+    return records[:MAX_PREVIEW_ROWS]
+
+
+# Resolved once at import so the uncapped default skips the per-call limit checks.
+_preview_impl = _preview_all if MAX_PREVIEW_ROWS is None else _preview_head
+
+
+def _collect_preview_head(records: Iterable[Dict[str, object]]) -> List[Dict[str, object]]:
+    return list(itertools.islice(records, MAX_PREVIEW_ROWS))
+
+
+# Materializes a lazily filtered preview, pulling no more rows than the cap.
+_collect_preview = list if MAX_PREVIEW_ROWS is None else _collect_preview_head
+
+# Opt-in: round the non-integral floats of preview rows to float32 precision
+# (7 significant digits) to shrink JSON payloads. Summaries, anomalies and
+# integral values (counters, even when stored as floats) are never rounded.
+QUANTIZE_PREVIEW_FLOATS = os.getenv("QUANTIZE_PREVIEW_FLOATS", "false").lower() in ("1", "true", "yes")
+
+
+def _quantize_float(value: float) -> float:
+    return float(f"{value:.7g}")
+
+
+def _quantize_preview_rows(rows: List[Dict[str, object]]) -> None:
+    """Round the non-integral floats of sanitized preview rows in place."""
+    for row in rows:
+        for key, value in row.items():
+            if type(value) is float and not value.is_integer():
+                row[key] = _quantize_float(value)
+
+# Per-service wall-clock timings (EMA) used to submit the slowest services to
+# the executor first. They are only persisted between runs when
+# SERVICE_TIMINGS_FILE is set; otherwise they live for the process lifetime.
+_SERVICE_TIMINGS_ENV = os.getenv("SERVICE_TIMINGS_FILE", "").strip()
+SERVICE_TIMINGS_FILE: Optional[Path] = Path(_SERVICE_TIMINGS_ENV).expanduser() if _SERVICE_TIMINGS_ENV else None
+SERVICE_TIMING_EMA_ALPHA = 0.3
+
+# Record keys probed (in order) when matching rows against an anomaly index.
+_ROW_GUID_KEYS = ("NodeGUID", "node_guid", "Node Guid", "NodeGuid", "GUID", "Guid")
+_ROW_PORT_KEYS = ("PortNumber", "PortNum", "Port", "Port Number", "Port #", "PortId", "PortID")
+
+# Heuristic markers used by AnalysisService._row_has_anomaly_markers.
+_SEVERITY_NORMAL = frozenset({"", "normal", "info", "ok", "pass", "healthy", "none"})
+_ISSUE_KEYS = frozenset({"issues", "issue", "problems", "alerts"})
+_NON_PROBLEM_TEXT = frozenset({"0", "false", "off", "normal", "none", "ok", "pass", "healthy", ""})
+_NUMERIC_KEY_KEYWORDS = (
+    "error",
+    "fail",
+    "linkdown",
+    "downed",
+    "down_count",
+    "recovery",
+    "alarm",
+    "warning",
+    "anomaly",
+    "icrc",
+    "parity",
+    "discard",
+    "drop",
+    "timeout",
+    "mismatch",
+    "violation",
+    "unhealthy",
+    "problem",
+    "issue",
+    "retry",
+    "fault",
+    "alert",
+)
+_NUMERIC_KEY_RE = re.compile("|".join(map(re.escape, _NUMERIC_KEY_KEYWORDS)))
+_THRESHOLD_KEY_RE = re.compile("threshold|limit")
+_NEGATIVE_VALUE_TOKENS = (
+    "fail",
+    "error",
+    "warning",
+    "critical",
+    "alarm",
+    "down",
+    "inactive",
+    "not active",
+    "mismatch",
+    "unsupported",
+    "timeout",
+    "asym",
+    "asymmetric",
+    "unhealthy",
+    "degraded",
+    "violation",
+    "missing",
+    "not present",
+    "fault",
+    "bad",
+    "exceeded",
+)
+_NEGATIVE_VALUE_RE = re.compile("|".join(map(re.escape, _NEGATIVE_VALUE_TOKENS)))
+
+# How _row_has_anomaly_markers treats a column, decided from its name alone.
+_MARKER_PROBLEM_VALUE = 0  # any non-zero / non-"ok" value is a problem
+_MARKER_SEVERITY = 1  # severity label outside _SEVERITY_NORMAL
+_MARKER_SKIP = 2  # thresholds/limits are configuration, not observations
+_MARKER_TEXT_VALUE = 3  # only free-text values are scanned for negative tokens
+
+
+@functools.lru_cache(maxsize=4096)
+def _marker_key_kind(key: object) -> int:
+    # Records of one dataset share their keys, so each name is classified once
+    # instead of being regex-matched for every row.
+    key_lower = str(key).lower()
+    if "anomaly" in key_lower:
+        return _MARKER_PROBLEM_VALUE
+    if "severity" in key_lower:
+        return _MARKER_SEVERITY
+    if key_lower in _ISSUE_KEYS:
+        return _MARKER_PROBLEM_VALUE
+    if _NUMERIC_KEY_RE.search(key_lower):
+        if _THRESHOLD_KEY_RE.search(key_lower):
+            return _MARKER_SKIP
+        return _MARKER_PROBLEM_VALUE
+    return _MARKER_TEXT_VALUE
+
+
+# Status/severity strings repeat across thousands of rows; normalize each once.
+@functools.lru_cache(maxsize=8192)
+def _severity_is_abnormal(text: str) -> bool:
+    severity = text.strip().lower()
+    return bool(severity) and severity not in _SEVERITY_NORMAL
+
+
+@functools.lru_cache(maxsize=8192)
+def _text_has_negative_token(text: str) -> bool:
+    return _NEGATIVE_VALUE_RE.search(text.lower()) is not None
+
+
 @dataclass
 class IbdiagnetDataset:
     """
@@ -75,24 +226,30 @@ class IbdiagnetDataset:
     """
 
     root: Path
-    _index_cache: Optional[pd.DataFrame] = None
+    _inventory: DatasetInventory = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._inventory = DatasetInventory(self.root)
+
+    @property
+    def inventory(self) -> DatasetInventory:
+        """Shared db_csv/index/topology cache handed to every service of a run."""
+        return self._inventory
 
     @property
     def index_table(self) -> pd.DataFrame:
-        if self._index_cache is None:
-            db_csv = self._find_db_csv()
-            self._index_cache = read_index_table(db_csv)
-        return self._index_cache
+        return self._inventory.index_table
 
     def table(self, name: str) -> pd.DataFrame:
         db_csv = self._find_db_csv()
         return read_table(db_csv, name, self.index_table)
 
+    def invalidate_db_csv(self) -> None:
+        """Forget the resolved db_csv path (and its index) so the next access re-scans."""
+        self._inventory = DatasetInventory(self.root)
+
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.root}")
-        return matches[0]
+        return self._inventory.db_csv
 
 
 class AnalysisService:
@@ -103,11 +260,51 @@ class AnalysisService:
     to run the equivalent of brief/cable/xmit/ber/hca processing.
     """
 
+    # Dataset services in default scheduling order (before timing-based reordering).
+    _SERVICE_REGISTRY: Dict[str, type] = {
+        "cable": CableService,
+        "xmit": XmitService,
+        "link_oscillation": LinkOscillationService,
+        "ber": BerService,
+        "hca": HcaService,
+        "fan": FanService,
+        "histogram": HistogramService,
+        "warnings": WarningsService,
+        "switch": SwitchService,
+        "routing": RoutingService,
+        "qos": QosService,
+        "sm_info": SMInfoService,
+        "port_hierarchy": PortHierarchyService,
+        "mlnx_counters": MlnxCountersService,
+        "pm_delta": PmDeltaService,
+        "vports": VPortsService,
+        "pkey": PkeyService,
+        "system_info": SystemInfoService,
+        "extended_port_info": ExtendedPortInfoService,
+        "ar_info": ArInfoService,
+        "sharp": SharpService,
+        "fec_mode": FecModeService,
+        "phy_diagnostics": PhyDiagnosticsService,
+        "neighbors": NeighborsService,
+        "buffer_histogram": BufferHistogramService,
+        "extended_node_info": ExtendedNodeInfoService,
+        "extended_switch_info": ExtendedSwitchInfoService,
+        "power_sensors": PowerSensorsService,
+        "routing_config": RoutingConfigService,
+        "temp_alerts": TempAlertsService,
+        "credit_watchdog": CreditWatchdogService,
+        "pci_performance": PciPerformanceService,
+        "per_lane_performance": PerLanePerformanceService,
+        "n2n_security": N2NSecurityService,
+    }
+
     def __init__(self, *, expected_topology_path: Optional[Path] = None):
         self._dataset_cache: Dict[Path, IbdiagnetDataset] = {}
         self._cache_lock = threading.Lock()  # Thread-safe cache access
         self._service_result_cache: Dict[Tuple[str, Path], object] = {}
         self._service_cache_lock = threading.Lock()
+        self._service_timings: Optional[Dict[str, float]] = None
+        self._timings_lock = threading.Lock()
         path = (
             Path(expected_topology_path).expanduser()
             if expected_topology_path
@@ -126,6 +323,9 @@ class AnalysisService:
                 self._dataset_cache[extracted_dir] = dataset
         return dataset
 
+    def _dataset_inventory(self, target_dir: Path) -> DatasetInventory:
+        return self.load_dataset(target_dir).inventory
+
     def release_dataset(self, extracted_dir: Path) -> None:
         """Release cached dataset/service state once analysis completes."""
         normalized = self._normalize_dataset_path(extracted_dir)
@@ -166,6 +366,60 @@ class AnalysisService:
             for cache_key in keys_to_remove:
                 self._service_result_cache.pop(cache_key, None)
 
+    def _load_service_timings(self) -> Dict[str, float]:
+        with self._timings_lock:
+            if self._service_timings is None:
+                timings: Dict[str, float] = {}
+                if SERVICE_TIMINGS_FILE is not None:
+                    try:
+                        raw = json.loads(SERVICE_TIMINGS_FILE.read_text(encoding="utf-8"))
+                        timings = {
+                            str(name): float(value)
+                            for name, value in raw.items()
+                            if isinstance(value, (int, float))
+                        }
+                    except (OSError, ValueError, AttributeError):
+                        pass
+                self._service_timings = timings
+            return dict(self._service_timings)
+
+    def _record_service_time(self, name: str, elapsed: float) -> None:
+        with self._timings_lock:
+            if self._service_timings is None:
+                self._service_timings = {}
+            previous = self._service_timings.get(name)
+            if previous is None:
+                self._service_timings[name] = elapsed
+            else:
+                alpha = SERVICE_TIMING_EMA_ALPHA
+                self._service_timings[name] = alpha * elapsed + (1 - alpha) * previous
+
+    def _save_service_timings(self) -> None:
+        with self._timings_lock:
+            snapshot = dict(self._service_timings or {})
+        if not snapshot or SERVICE_TIMINGS_FILE is None:
+            return
+        # Write a sibling temp file and rename it over the target so concurrent
+        # analyses never read a half-written file.
+        tmp_path: Optional[Path] = None
+        try:
+            SERVICE_TIMINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=SERVICE_TIMINGS_FILE.parent,
+                prefix=f".{SERVICE_TIMINGS_FILE.name}.",
+                suffix=".tmp",
+                delete=False,
+            ) as handle:
+                tmp_path = Path(handle.name)
+                json.dump(snapshot, handle, indent=2, sort_keys=True)
+            os.replace(tmp_path, SERVICE_TIMINGS_FILE)
+        except OSError as exc:
+            logger.debug("Could not persist service timings: %s", exc)
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+
     def _default_expected_topology_path(self) -> Optional[Path]:
         env_var = os.environ.get("EXPECTED_TOPOLOGY_FILE")
         if env_var:
@@ -194,52 +448,39 @@ class AnalysisService:
         loop = loop or asyncio.get_event_loop()
 
         try:
+            custom_runners = {
+                "ber": self._run_ber_service,
+                "hca": self._run_hca_service,
+                "warnings": self._run_warnings_service,
+            }
             service_specs = [
-                ("cable", "Running native cable analysis...", self._run_cable_service),
-                ("xmit", "Running native xmit analysis...", self._run_xmit_service),
-                ("link_oscillation", "Running link oscillation analysis...", self._run_link_oscillation_service),
-                ("ber", "Running native BER analysis...", self._run_ber_service),
-                ("hca", "Running native HCA analysis...", self._run_hca_service),
-                ("fan", "Running native fan analysis...", self._run_fan_service),
-                ("histogram", "Running performance histogram analysis...", self._run_histogram_service),
-                ("warnings", "Running ibdiagnet warnings analysis...", self._run_warnings_service),
-                ("switch", "Running switch analysis...", self._run_switch_service),
-                ("routing", "Running routing analysis...", self._run_routing_service),
-                ("qos", "Running QoS/VL arbitration analysis...", self._run_qos_service),
-                ("sm_info", "Running Subnet Manager analysis...", self._run_sm_info_service),
-                ("port_hierarchy", "Running Port Hierarchy analysis...", self._run_port_hierarchy_service),
-                ("mlnx_counters", "Running MLNX Counters analysis...", self._run_mlnx_counters_service),
-                ("pm_delta", "Running PM Delta analysis...", self._run_pm_delta_service),
-                ("vports", "Running VPorts analysis...", self._run_vports_service),
-                ("pkey", "Running PKEY analysis...", self._run_pkey_service),
-                ("system_info", "Running System Info analysis...", self._run_system_info_service),
-                ("extended_port_info", "Running Extended Port Info analysis...", self._run_extended_port_info_service),
-                ("ar_info", "Running AR Info analysis...", self._run_ar_info_service),
-                ("sharp", "Running SHARP analysis...", self._run_sharp_service),
-                ("fec_mode", "Running FEC Mode analysis...", self._run_fec_mode_service),
-                ("phy_diagnostics", "Running PHY Diagnostics analysis...", self._run_phy_diagnostics_service),
-                ("neighbors", "Running Neighbors analysis...", self._run_neighbors_service),
-                ("buffer_histogram", "Running Buffer Histogram analysis...", self._run_buffer_histogram_service),
-                ("extended_node_info", "Running Extended Node Info analysis...", self._run_extended_node_info_service),
-                ("extended_switch_info", "Running Extended Switch Info analysis...", self._run_extended_switch_info_service),
-                ("power_sensors", "Running Power Sensors analysis...", self._run_power_sensors_service),
-                ("routing_config", "Running Routing Config analysis...", self._run_routing_config_service),
-                ("temp_alerts", "Running Temperature Alerts analysis...", self._run_temp_alerts_service),
-                ("credit_watchdog", "Running Credit Watchdog analysis...", self._run_credit_watchdog_service),
-                ("pci_performance", "Running PCI Performance analysis...", self._run_pci_performance_service),
-                ("per_lane_performance", "Running Per-Lane Performance analysis...", self._run_per_lane_performance_service),
-                ("n2n_security", "Running N2N Security analysis...", self._run_n2n_security_service),
+                (name, custom_runners.get(name) or functools.partial(self._run_service, name))
+                for name in self._SERVICE_REGISTRY
             ]
-
+            # Longest-running services first so they are not queued behind quick ones.
+            timings = self._load_service_timings()
+            service_specs.sort(key=lambda spec: -timings.get(spec[0], 0.0))
+
+            logger.info(
+                "Scheduling %d services: %s",
+                len(service_specs),
+                [name for name, _ in service_specs],
+            )
             service_futures = {}
-            for name, log_message, runner in service_specs:
-                logger.info(log_message)
-                service_futures[name] = loop.run_in_executor(executor, runner, target_dir)
+            for name, runner in service_specs:
+                future = loop.run_in_executor(
+                    executor, self._timed_runner, name, runner, target_dir
+                )
+                future.add_done_callback(
+                    functools.partial(self._log_service_completion, name, loop, loop.time())
+                )
+                service_futures[name] = future
 
             results = await asyncio.gather(*service_futures.values())
+            self._save_service_timings()
 
             service_results = {
-                name: result for (name, _, _), result in zip(service_specs, results)
+                name: result for (name, _), result in zip(service_specs, results)
             }
 
             logger.info("All analyses completed")
@@ -315,17 +556,33 @@ class AnalysisService:
         pci_performance_rows = pci_performance_analysis.data
         per_lane_performance_rows = per_lane_performance_analysis.data
         n2n_security_rows = n2n_security_analysis.data
-        cable_anomalies = self._flatten_anomaly_records(cable_analysis.anomalies)
-        xmit_anomalies = self._flatten_anomaly_records(xmit_analysis.anomalies)
-        ber_anomalies = self._flatten_anomaly_records(ber_analysis.anomalies)
-        hca_anomalies = self._flatten_anomaly_records(hca_anomaly_df)
-        fan_anomalies = self._flatten_anomaly_records(fan_analysis.anomalies)
-        histogram_anomalies = self._flatten_anomaly_records(histogram_analysis.anomalies)
-        routing_anomalies = self._flatten_anomaly_records(routing_analysis.anomalies)
-        pci_performance_anomalies = self._flatten_anomaly_records(pci_performance_analysis.anomalies)
-        qos_anomalies = self._flatten_anomaly_records(qos_analysis.anomalies)
-        mlnx_counters_anomalies = self._flatten_anomaly_records(mlnx_counters_analysis.anomalies)
-        pm_delta_anomalies = self._flatten_anomaly_records(pm_delta_analysis.anomalies)
+        anomaly_frames = {
+            "cable": cable_analysis.anomalies,
+            "xmit": xmit_analysis.anomalies,
+            "ber": ber_analysis.anomalies,
+            "hca": hca_anomaly_df,
+            "fan": fan_analysis.anomalies,
+            "histogram": histogram_analysis.anomalies,
+            "routing": routing_analysis.anomalies,
+            "qos": qos_analysis.anomalies,
+            "mlnx_counters": mlnx_counters_analysis.anomalies,
+            "pm_delta": pm_delta_analysis.anomalies,
+            "pci_performance": pci_performance_analysis.anomalies,
+        }
+        flattened_anomalies = {
+            name: self._flatten_anomalies(frame) for name, frame in anomaly_frames.items()
+        }
+        anomaly_sources = {name: records for name, (records, _) in flattened_anomalies.items()}
+        cable_anomalies = anomaly_sources["cable"]
+        xmit_anomalies = anomaly_sources["xmit"]
+        ber_anomalies = anomaly_sources["ber"]
+        hca_anomalies = anomaly_sources["hca"]
+        fan_anomalies = anomaly_sources["fan"]
+        histogram_anomalies = anomaly_sources["histogram"]
+        routing_anomalies = anomaly_sources["routing"]
+        qos_anomalies = anomaly_sources["qos"]
+        mlnx_counters_anomalies = anomaly_sources["mlnx_counters"]
+        pm_delta_anomalies = anomaly_sources["pm_delta"]
 
         logger.info("Building analysis brief locally...")
         brief_payload = await loop.run_in_executor(
@@ -351,23 +608,8 @@ class AnalysisService:
         ]
         extra_sources = [(name, rows) for name, rows in extra_sources if rows]
 
-        anomaly_sources = {
-            "cable": cable_anomalies,
-            "xmit": xmit_anomalies,
-            "ber": ber_anomalies,
-            "hca": hca_anomalies,
-            "fan": fan_anomalies,
-            "histogram": histogram_anomalies,
-            "routing": routing_anomalies,
-            "qos": qos_anomalies,
-            "mlnx_counters": mlnx_counters_anomalies,
-            "pm_delta": pm_delta_anomalies,
-            "pci_performance": pci_performance_anomalies,
-        }
         anomaly_index_map = {
-            name: self._build_anomaly_index(rows)
-            for name, rows in anomaly_sources.items()
-            if rows
+            name: index for name, (records, index) in flattened_anomalies.items() if records
         }
         analysis_index: Set[Tuple[str, Optional[int]]] = set()
         for key in ("cable", "xmit", "ber", "hca"):
@@ -479,17 +721,12 @@ class AnalysisService:
         warnings_by_category = warnings_analysis.get("by_category", {})
         warnings_summary = warnings_analysis.get("summary", {})
 
-        def preview_full(name: str) -> List[Dict[str, object]]:
-            return self._preview_records(datasets.get(name, []))
-
-        def preview_issues(name: str) -> List[Dict[str, object]]:
-            return self._preview_records(filtered_datasets.get(name, []))
-
         analysis_full_rows = datasets.get("analysis", [])
+        preview_keys = ["data", "data_issue_rows"]
         payload = {
             "health": health,
-            "data": self._preview_records(analysis_full_rows),
-            "data_issue_rows": self._preview_records(analysis_rows),
+            "data": _preview_impl(analysis_full_rows),
+            "data_issue_rows": _preview_impl(analysis_rows),
             "cable_summary": cable_summary,
             "switch_summary": switch_analysis.summary,
             "routing_summary": routing_analysis.summary,
@@ -565,163 +802,80 @@ class AnalysisService:
         }
 
         for dataset_name, alias in dataset_aliases.items():
-            payload[f"{alias}_data"] = preview_full(dataset_name)
-            payload[f"{alias}_issue_rows"] = preview_issues(dataset_name)
+            payload[f"{alias}_data"] = _preview_impl(datasets.get(dataset_name, []))
+            payload[f"{alias}_issue_rows"] = _preview_impl(filtered_datasets.get(dataset_name, []))
+            preview_keys += [f"{alias}_data", f"{alias}_issue_rows"]
             payload[f"{alias}_total_rows"] = dataset_totals.get(
                 dataset_name, len(datasets.get(dataset_name, []))
             )
         payload["issues"] = issues
-        return self._sanitize(payload)
+        sanitized = self._sanitize(payload)
+        if QUANTIZE_PREVIEW_FLOATS:
+            for key in preview_keys:
+                _quantize_preview_rows(sanitized[key])
+        return sanitized
+
+    def _log_service_completion(
+        self,
+        name: str,
+        loop: asyncio.AbstractEventLoop,
+        started: float,
+        future: asyncio.Future,
+    ) -> None:
+        elapsed = loop.time() - started
+        if future.cancelled():
+            logger.info("%s cancelled after %.2fs", name, elapsed)
+        elif future.exception() is not None:
+            logger.info("%s failed after %.2fs", name, elapsed)
+        else:
+            logger.info("%s finished in %.2fs", name, elapsed)
+
+    def _timed_runner(self, name: str, runner, target_dir: Path):
+        # Measured in the worker so executor queue wait doesn't skew the ordering.
+        started = time.perf_counter()
+        result = runner(target_dir)
+        self._record_service_time(name, time.perf_counter() - started)
+        return result
 
-    def _run_cable_service(self, target_dir: Path):
-        service = CableService(dataset_root=target_dir)
-        return service.run()
+    def _new_service(self, name: str, target_dir: Path):
+        service_cls = self._SERVICE_REGISTRY[name]
+        return service_cls(dataset_root=target_dir, dataset_inventory=self._dataset_inventory(target_dir))
 
-    def _run_xmit_service(self, target_dir: Path):
-        service = XmitService(dataset_root=target_dir)
-        return service.run()
+    def _run_service(self, name: str, target_dir: Path):
+        return self._new_service(name, target_dir).run()
 
-    def _run_link_oscillation_service(self, target_dir: Path):
-        service = LinkOscillationService(dataset_root=target_dir)
-        return service.run()
+    def _dataset_fingerprint(self, target_dir: Path) -> Optional[Tuple[Path, int]]:
+        """Identify the dataset's db_csv contents by path and modification time."""
+        try:
+            db_csv = self._dataset_inventory(target_dir).db_csv
+            return db_csv, db_csv.stat().st_mtime_ns
+        except OSError:
+            return None
 
     def _run_ber_service(self, target_dir: Path):
+        fingerprint = self._dataset_fingerprint(target_dir)
         cached = self._get_cached_service_result("ber", target_dir)
-        if cached is not None:
+        if cached is not None and fingerprint is not None and cached[0] == fingerprint:
             logger.debug("Reusing cached BER analysis for dataset %s", target_dir)
-            return cached
-        service = BerService(dataset_root=target_dir)
-        result = service.run()
-        self._set_cached_service_result("ber", target_dir, result)
+            return cached[1]
+        result = self._run_service("ber", target_dir)
+        self._set_cached_service_result("ber", target_dir, (fingerprint, result))
         return result
 
     def _run_hca_service(self, target_dir: Path) -> Tuple[List[Dict[str, object]], pd.DataFrame]:
-        service = HcaService(dataset_root=target_dir)
+        service = self._new_service("hca", target_dir)
         data = service.run()
         anomalies = service.build_anomalies()
         return data, anomalies
 
-    def _run_fan_service(self, target_dir: Path):
-        service = FanService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_histogram_service(self, target_dir: Path):
-        service = HistogramService(dataset_root=target_dir)
-        return service.run()
-
     def _run_warnings_service(self, target_dir: Path):
-        service = WarningsService(dataset_root=target_dir)
-        analysis = service.run()
+        service = self._new_service("warnings", target_dir)
+        service.run()
         return {
             "by_category": service.get_warnings_by_category(),
             "summary": service.get_summary_dict(),
         }
 
-    def _run_switch_service(self, target_dir: Path):
-        service = SwitchService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_routing_service(self, target_dir: Path):
-        service = RoutingService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_qos_service(self, target_dir: Path):
-        service = QosService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_sm_info_service(self, target_dir: Path):
-        service = SMInfoService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_port_hierarchy_service(self, target_dir: Path):
-        service = PortHierarchyService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_mlnx_counters_service(self, target_dir: Path):
-        service = MlnxCountersService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_pm_delta_service(self, target_dir: Path):
-        service = PmDeltaService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_vports_service(self, target_dir: Path):
-        service = VPortsService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_pkey_service(self, target_dir: Path):
-        service = PkeyService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_system_info_service(self, target_dir: Path):
-        service = SystemInfoService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_extended_port_info_service(self, target_dir: Path):
-        service = ExtendedPortInfoService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_ar_info_service(self, target_dir: Path):
-        service = ArInfoService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_sharp_service(self, target_dir: Path):
-        service = SharpService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_fec_mode_service(self, target_dir: Path):
-        service = FecModeService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_phy_diagnostics_service(self, target_dir: Path):
-        service = PhyDiagnosticsService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_neighbors_service(self, target_dir: Path):
-        service = NeighborsService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_buffer_histogram_service(self, target_dir: Path):
-        service = BufferHistogramService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_extended_node_info_service(self, target_dir: Path):
-        service = ExtendedNodeInfoService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_extended_switch_info_service(self, target_dir: Path):
-        service = ExtendedSwitchInfoService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_power_sensors_service(self, target_dir: Path):
-        service = PowerSensorsService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_routing_config_service(self, target_dir: Path):
-        service = RoutingConfigService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_temp_alerts_service(self, target_dir: Path):
-        service = TempAlertsService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_credit_watchdog_service(self, target_dir: Path):
-        service = CreditWatchdogService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_pci_performance_service(self, target_dir: Path):
-        service = PciPerformanceService(dataset_root=target_dir)
-        return service.run()
-
-
-    def _run_per_lane_performance_service(self, target_dir: Path):
-        service = PerLanePerformanceService(dataset_root=target_dir)
-        return service.run()
-
-    def _run_n2n_security_service(self, target_dir: Path):
-        service = N2NSecurityService(dataset_root=target_dir)
-        return service.run()
-
     def _build_brief(
         self,
         xmit_rows: List[Dict[str, object]],
@@ -738,32 +892,85 @@ class AnalysisService:
         )
         return {"data": result.data, "debug_stdout": result.debug_stdout, "debug_stderr": result.debug_stderr}
 
-    def _flatten_anomaly_records(self, frame: Optional[pd.DataFrame]) -> List[Dict[str, object]]:
+    def _anomaly_weights(
+        self, frame: Optional[pd.DataFrame]
+    ) -> Optional[Tuple[np.ndarray, List[str]]]:
+        """Return the (rows x anomaly columns) weight matrix and each column's anomaly value."""
         if frame is None or frame.empty:
-            return []
+            return None
         value_columns = [col for col in frame.columns if col not in IBH_ANOMALY_TBL_KEY]
-        if not value_columns:
-            return []
-        rows: List[Dict[str, object]] = []
-        for _, row in frame.iterrows():
-            node_guid = row.get("NodeGUID", "")
-            port_number = self._safe_port(row.get("PortNumber"))
-            for column in value_columns:
-                anomaly_type = self._column_to_anomaly(column)
-                if anomaly_type is None:
-                    continue
-                weight = self._safe_float(row.get(column))
-                if weight <= 0:
-                    continue
-                rows.append(
-                    {
-                        "NodeGUID": node_guid,
-                        "PortNumber": port_number if port_number is not None else 0,
-                        IBH_ANOMALY_AGG_COL: anomaly_type.value,
-                        IBH_ANOMALY_AGG_WEIGHT: weight,
-                    }
-                )
-        return rows
+        anomaly_columns: List[str] = []
+        anomaly_values: List[str] = []
+        for column in value_columns:
+            anomaly_type = self._column_to_anomaly(column)
+            if anomaly_type is not None:
+                anomaly_columns.append(column)
+                anomaly_values.append(anomaly_type.value)
+        if not anomaly_columns:
+            return None
+
+        weights = (
+            frame[anomaly_columns]
+            .apply(pd.to_numeric, errors="coerce")
+            .to_numpy(dtype=float, na_value=np.nan, copy=True)
+        )
+        weights[~np.isfinite(weights)] = 0.0
+        return weights, anomaly_values
+
+    def _flatten_anomalies(
+        self, frame: Optional[pd.DataFrame]
+    ) -> Tuple[List[Dict[str, object]], Set[Tuple[str, Optional[int]]]]:
+        """Flatten an anomaly frame and build its (guid, port) index in one pass.
+
+        The records hold native Python scalars, so they need no later sanitizing.
+        """
+        resolved = self._anomaly_weights(frame)
+        if resolved is None:
+            return [], set()
+        weights, anomaly_values = resolved
+        # np.nonzero walks the mask row-major, matching the old per-row ordering.
+        row_positions, column_positions = np.nonzero(weights > 0)
+        if not len(row_positions):
+            return [], set()
+
+        row_count = len(frame)
+        node_guids = frame["NodeGUID"].tolist() if "NodeGUID" in frame.columns else [""] * row_count
+        port_numbers = self._port_numbers(frame).tolist()
+        records = [
+            {
+                "NodeGUID": node_guids[row_pos],
+                "PortNumber": port_numbers[row_pos],
+                IBH_ANOMALY_AGG_COL: anomaly_values[col_pos],
+                IBH_ANOMALY_AGG_WEIGHT: weight,
+            }
+            for row_pos, col_pos, weight in zip(
+                row_positions.tolist(),
+                column_positions.tolist(),
+                weights[row_positions, column_positions].tolist(),
+            )
+        ]
+
+        hit_rows = np.unique(row_positions).tolist()
+        if "NodeGUID" in frame.columns:
+            normalize = self._normalize_guid_token
+            guids = [normalize(node_guids[row_pos]) for row_pos in hit_rows]
+        else:
+            guids = [""] * len(hit_rows)
+        ports = [port_numbers[row_pos] or None for row_pos in hit_rows]
+        index = set(zip(guids, ports))
+        index.discard(("", None))
+        return records, index
+
+    @staticmethod
+    def _port_numbers(frame: pd.DataFrame) -> np.ndarray:
+        """Column-wise _safe_port over PortNumber, with unparseable/missing ports as 0."""
+        if "PortNumber" not in frame.columns:
+            return np.zeros(len(frame), dtype=np.int64)
+        ports = np.trunc(
+            pd.to_numeric(frame["PortNumber"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        )
+        ports[~np.isfinite(ports)] = 0
+        return ports.astype(np.int64)
 
     def _filter_anomalies(
         self,
@@ -773,58 +980,42 @@ class AnalysisService:
     ) -> List[Dict[str, object]]:
         if not rows:
             return []
-        preview = self._preview_records
+        preview = _preview_impl
         if dataset_name in {"ber", "analysis", "link_oscillation"}:
             return preview(rows)
+        # Matching stops once a capped preview is full; rows past the limit
+        # would be dropped anyway.
         if anomaly_index:
-            matched = [row for row in rows if self._row_matches_anomaly_index(row, anomaly_index)]
+            matched = _collect_preview(self._iter_rows_matching_anomaly_index(rows, anomaly_index))
             if matched:
-                return preview(matched)
-        heuristic_rows = [row for row in rows if self._row_has_anomaly_markers(row)]
+                return matched
+        heuristic_rows = _collect_preview(row for row in rows if self._row_has_anomaly_markers(row))
         if heuristic_rows:
-            return preview(heuristic_rows)
+            return heuristic_rows
         return preview(rows)
 
-    def _build_anomaly_index(self, anomaly_rows: List[Dict[str, object]]) -> Set[Tuple[str, Optional[int]]]:
-        index: Set[Tuple[str, Optional[int]]] = set()
-        for row in anomaly_rows:
-            guid = self._normalize_guid_token(row.get("NodeGUID"))
-            port = self._safe_port(row.get("PortNumber"))
-            normalized_port = None if port in (None, 0) else port
-            if guid or normalized_port is not None:
-                index.add((guid, normalized_port))
-        return index
-
-    def _row_matches_anomaly_index(
+    def _iter_rows_matching_anomaly_index(
         self,
-        row: Dict[str, object],
+        rows: List[Dict[str, object]],
         anomaly_index: Set[Tuple[str, Optional[int]]],
-    ) -> bool:
-        if not anomaly_index:
-            return False
-        guid = self._extract_guid_from_row(row)
-        port = self._extract_port_from_row(row)
-        normalized_port = None if port in (None, 0) else port
-        candidates = [(guid, normalized_port)]
-        candidates.append((guid, None))
-        if not guid:
-            candidates.append(("", normalized_port))
-            candidates.append(("", None))
-        for candidate in candidates:
-            if candidate in anomaly_index:
-                return True
-        return False
+    ) -> Iterator[Dict[str, object]]:
+        """Yield the rows whose (guid, port), or guid alone, is in the anomaly index."""
+        # Split the index once: GUID-wide entries match any port, so most rows
+        # resolve with a single probe and never need their port parsed.
+        guid_only = {guid for guid, port in anomaly_index if port is None}
+        extract_guid = self._extract_guid_from_row
+        extract_port = self._extract_port_from_row
+        for row in rows:
+            guid = extract_guid(row)
+            if guid in guid_only:
+                yield row
+                continue
+            port = extract_port(row)
+            if port and (guid, port) in anomaly_index:
+                yield row
 
     def _extract_guid_from_row(self, row: Dict[str, object]) -> str:
-        guid_keys = (
-            "NodeGUID",
-            "node_guid",
-            "Node Guid",
-            "NodeGuid",
-            "GUID",
-            "Guid",
-        )
-        for key in guid_keys:
+        for key in _ROW_GUID_KEYS:
             if key in row:
                 value = row.get(key)
                 if value is not None and str(value).strip():
@@ -832,16 +1023,7 @@ class AnalysisService:
         return ""
 
     def _extract_port_from_row(self, row: Dict[str, object]) -> Optional[int]:
-        port_keys = (
-            "PortNumber",
-            "PortNum",
-            "Port",
-            "Port Number",
-            "Port #",
-            "PortId",
-            "PortID",
-        )
-        for key in port_keys:
+        for key in _ROW_PORT_KEYS:
             if key in row:
                 port_value = self._safe_port(row.get(key))
                 if port_value is not None:
@@ -851,7 +1033,13 @@ class AnalysisService:
     def _normalize_guid_token(self, value: object) -> str:
         if value is None:
             return ""
-        text = str(value).strip().lower()
+        return self._cached_normalize_guid_token(str(value))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8192)
+    def _cached_normalize_guid_token(raw: str) -> str:
+        """Cached normalization; the same GUIDs recur across many ports and rows."""
+        text = raw.strip().lower()
         if not text or text in {"none", "null"}:
             return ""
         if text.startswith("0x"):
@@ -862,82 +1050,33 @@ class AnalysisService:
             return text
 
     def _row_has_anomaly_markers(self, row: Dict[str, object]) -> bool:
-        severity_normal = {"", "normal", "info", "ok", "pass", "healthy", "none"}
-        numeric_keywords = (
-            "error",
-            "fail",
-            "linkdown",
-            "downed",
-            "down_count",
-            "recovery",
-            "alarm",
-            "warning",
-            "anomaly",
-            "icrc",
-            "parity",
-            "discard",
-            "drop",
-            "timeout",
-            "mismatch",
-            "violation",
-            "unhealthy",
-            "problem",
-            "issue",
-            "retry",
-            "fault",
-            "alert",
-        )
-        negative_value_tokens = (
-            "fail",
-            "error",
-            "warning",
-            "critical",
-            "alarm",
-            "down",
-            "inactive",
-            "not active",
-            "mismatch",
-            "unsupported",
-            "timeout",
-            "asym",
-            "asymmetric",
-            "unhealthy",
-            "degraded",
-            "violation",
-            "missing",
-            "not present",
-            "fault",
-            "bad",
-            "exceeded",
-        )
         for key, value in row.items():
             if isinstance(value, (dict, list)):
                 continue
-            key_lower = str(key).lower()
-            if "anomaly" in key_lower:
+            kind = _marker_key_kind(key)
+            if kind == _MARKER_PROBLEM_VALUE:
                 if self._value_indicates_problem(value):
                     return True
-                continue
-            if "severity" in key_lower:
-                severity = str(value).strip().lower()
-                if severity and severity not in severity_normal:
-                    return True
-                continue
-            if key_lower in {"issues", "issue", "problems", "alerts"}:
-                if self._value_indicates_problem(value):
+            elif kind == _MARKER_SEVERITY:
+                if _severity_is_abnormal(str(value)):
                     return True
-                continue
-            if any(keyword in key_lower for keyword in numeric_keywords):
-                if "threshold" in key_lower or "limit" in key_lower:
-                    continue
-                if self._value_indicates_problem(value):
+            elif kind == _MARKER_TEXT_VALUE:
+                if isinstance(value, str) and _text_has_negative_token(value):
                     return True
-                continue
-            if any(token in (str(value).strip().lower() if isinstance(value, str) else "") for token in negative_value_tokens):
-                return True
         return False
 
     def _value_indicates_problem(self, value: object) -> bool:
+        # Exact-type fast paths for the plain Python scalars most cells hold;
+        # NumPy scalars and other exotic types fall through to the generic checks.
+        value_type = type(value)
+        if value_type is str:
+            return value.strip().lower() not in _NON_PROBLEM_TEXT
+        if value_type is bool:
+            return value
+        if value_type is int:
+            return value != 0
+        if value_type is float:
+            return value != 0.0 and math.isfinite(value)
         if value is None:
             return False
         if isinstance(value, bool):
@@ -947,30 +1086,12 @@ class AnalysisService:
             if math.isnan(numeric) or math.isinf(numeric):
                 return False
             return numeric != 0.0
-        text = str(value).strip().lower()
-        if not text:
-            return False
-        if text in {"0", "false", "off", "normal", "none", "ok", "pass", "healthy"}:
-            return False
-        return True
+        return str(value).strip().lower() not in _NON_PROBLEM_TEXT
 
 
     @staticmethod
     def _column_to_anomaly(column: str) -> Optional[AnomlyType]:
-        for atype in AnomlyType:
-            if str(atype) == column or atype.value == column:
-                return atype
-        return None
-
-    @staticmethod
-    def _safe_float(value: object) -> float:
-        try:
-            numeric = float(value)
-        except (TypeError, ValueError):
-            return 0.0
-        if math.isnan(numeric) or math.isinf(numeric):
-            return 0.0
-        return numeric
+        return COLUMN_TO_ANOMALY.get(column)
 
     @staticmethod
     def _safe_port(value: object) -> Optional[int]:
@@ -985,24 +1106,41 @@ class AnalysisService:
         except (TypeError, ValueError):
             return None
 
-    def _preview_records(self, records: List[Dict[str, object]]) -> List[Dict[str, object]]:
-        if not records:
-            return records
-        if MAX_PREVIEW_ROWS is None:
-            return records
-        if len(records) <= MAX_PREVIEW_ROWS:
-            return records
-        return records[:MAX_PREVIEW_ROWS]
-
     def _sanitize(self, value):
-        if isinstance(value, dict):
-            return {key: self._sanitize(val) for key, val in value.items()}
-        if isinstance(value, list):
-            return [self._sanitize(item) for item in value]
-        if value is None:
-            return None
-        if isinstance(value, bool):
+        if not isinstance(value, (dict, list)):
+            return self._sanitize_scalar(value)
+        # Walk containers with an explicit stack; each child container is placed
+        # in its parent before being filled, so ordering is preserved.
+        root = {} if isinstance(value, dict) else []
+        stack = [(value, root)]
+        sanitize_scalar = self._sanitize_scalar
+        while stack:
+            source, target = stack.pop()
+            items = source.items() if isinstance(source, dict) else enumerate(source)
+            is_dict = isinstance(target, dict)
+            for key, item in items:
+                if isinstance(item, dict):
+                    cleaned = {}
+                    stack.append((item, cleaned))
+                elif isinstance(item, list):
+                    cleaned = []
+                    stack.append((item, cleaned))
+                else:
+                    cleaned = sanitize_scalar(item)
+                if is_dict:
+                    target[key] = cleaned
+                else:
+                    target.append(cleaned)
+        return root
+
+    def _sanitize_scalar(self, value):
+        value_type = type(value)
+        if value_type is str or value_type is bool or value is None:
+            return value
+        if value_type is int:
             return value
+        if value_type is float:
+            return value if math.isfinite(value) else None
         if hasattr(value, "item"):
             try:
                 return self._sanitize(value.item())
@@ -73,4 +73,18 @@ class AnomlyType(Enum):
     IBH_RECENT_REBOOT = "Frequent Host Reboot"
 
     def __str__(self) -> str:
-        return f"{IBH_ANOMALY_AGG_COL} {self.value}"
+        return self._column_name
+
+
+# Column headers are used as DataFrame keys on every anomaly build; format them once.
+for _atype in AnomlyType:
+    _atype._column_name = f"{IBH_ANOMALY_AGG_COL} {_atype.value}"
+del _atype
+
+
+# Anomaly column name -> type, accepting both the aggregated column header
+# ("IBH Anomaly <value>") and the bare value.
+COLUMN_TO_ANOMALY = {
+    **{str(atype): atype for atype in AnomlyType},
+    **{atype.value: atype for atype in AnomlyType},
+}
@@ -12,13 +12,40 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
 
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 logger = logging.getLogger(__name__)
 
+TRUE_TOKENS = ("1", "true", "yes", "enabled")
+
+# AR_INFO columns consumed by the analysis.
+AR_INFO_COLUMNS = [
+    "NodeGUID",
+    "is_arn_sup",
+    "is_frn_sup",
+    "is_fr_sup",
+    "fr_enabled",
+    "rn_xmit_enabled",
+    "is_hbf_supported",
+    "by_sl_hbf_en",
+    "is_whbf_supported",
+    "whbf_en",
+    "is_pfrn_supported",
+    "pfrn_enabled",
+    "group_cap",
+    "group_top",
+    "sub_grps_active",
+    "glb_groups",
+    "ar_version_cap",
+    "rn_version_cap",
+]
+
 
 @dataclass
 class ArInfoResult:
@@ -31,9 +58,9 @@ class ArInfoResult:
 class ArInfoService:
     """Analyze Adaptive Routing configuration and capabilities."""
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = dataset_root
-        self._index_cache: Optional[pd.DataFrame] = None
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._topology: Optional[TopologyLookup] = None
 
     def run(self) -> ArInfoResult:
@@ -44,126 +71,94 @@ class ArInfoService:
             return ArInfoResult()
 
         topology = self._get_topology()
-        records = []
-
-        # Track statistics
-        ar_supported = 0
-        fr_supported = 0
-        fr_enabled = 0
-        hbf_supported = 0
-        hbf_enabled = 0
-        pfrn_supported = 0
-        pfrn_enabled = 0
-
-        for _, row in ar_df.iterrows():
-            node_guid = str(row.get("NodeGUID", ""))
-
-            # Get node name
-            node_name = topology.node_label(node_guid) if topology else node_guid
-
-            # AR capabilities
-            is_arn_sup = self._safe_bool(row.get("is_arn_sup"))
-            is_frn_sup = self._safe_bool(row.get("is_frn_sup"))
-            is_fr_sup = self._safe_bool(row.get("is_fr_sup"))
-            fr_en = self._safe_bool(row.get("fr_enabled"))
-            rn_xmit_en = self._safe_bool(row.get("rn_xmit_enabled"))
-
-            # HBF capabilities
-            is_hbf_sup = self._safe_bool(row.get("is_hbf_supported"))
-            by_sl_hbf_en = self._safe_bool(row.get("by_sl_hbf_en"))
-            is_whbf_sup = self._safe_bool(row.get("is_whbf_supported"))
-            whbf_en = self._safe_bool(row.get("whbf_en"))
-
-            # PFRN capabilities
-            is_pfrn_sup = self._safe_bool(row.get("is_pfrn_supported"))
-            pfrn_en = self._safe_bool(row.get("pfrn_enabled"))
-
-            # Group configuration
-            group_cap = self._safe_int(row.get("group_cap", 0))
-            group_top = self._safe_int(row.get("group_top", 0))
-            sub_grps_active = self._safe_int(row.get("sub_grps_active", 0))
-            glb_groups = self._safe_int(row.get("glb_groups", 0))
-
-            # AR version info
-            ar_version = self._safe_int(row.get("ar_version_cap", 0))
-            rn_version = self._safe_int(row.get("rn_version_cap", 0))
-
-            # Track statistics
-            if is_arn_sup or is_frn_sup:
-                ar_supported += 1
-            if is_fr_sup:
-                fr_supported += 1
-            if fr_en:
-                fr_enabled += 1
-            if is_hbf_sup:
-                hbf_supported += 1
-            if by_sl_hbf_en or whbf_en:
-                hbf_enabled += 1
-            if is_pfrn_sup:
-                pfrn_supported += 1
-            if pfrn_en:
-                pfrn_enabled += 1
-
-            # Determine issues
-            issues = []
-            severity = "normal"
-
-            # Check for supported but not enabled features
-            if is_fr_sup and not fr_en:
-                issues.append("Fast Recovery supported but disabled")
-                if severity == "normal":
-                    severity = "info"
-
-            if is_hbf_sup and not (by_sl_hbf_en or whbf_en):
-                issues.append("HBF supported but disabled")
-                if severity == "normal":
-                    severity = "info"
-
-            if is_pfrn_sup and not pfrn_en:
-                issues.append("PFRN supported but disabled")
-                if severity == "normal":
-                    severity = "info"
-
-            record = {
-                "NodeGUID": node_guid,
-                "NodeName": node_name,
+
+        # Missing columns become NaN, which the coercions map to False / 0 exactly
+        # like the old row.get() defaults did.
+        frame = ar_df.reindex(columns=AR_INFO_COLUMNS)
+        if "NodeGUID" not in ar_df.columns:
+            frame["NodeGUID"] = ""
+
+        node_guids = [str(value) for value in frame["NodeGUID"]]
+        node_names = (
+            [topology.node_label(guid) for guid in node_guids] if topology else node_guids
+        )
+
+        # AR capabilities
+        is_arn_sup = self._bool_column(frame["is_arn_sup"])
+        is_frn_sup = self._bool_column(frame["is_frn_sup"])
+        is_fr_sup = self._bool_column(frame["is_fr_sup"])
+        fr_en = self._bool_column(frame["fr_enabled"])
+        rn_xmit_en = self._bool_column(frame["rn_xmit_enabled"])
+
+        # HBF capabilities
+        is_hbf_sup = self._bool_column(frame["is_hbf_supported"])
+        by_sl_hbf_en = self._bool_column(frame["by_sl_hbf_en"])
+        is_whbf_sup = self._bool_column(frame["is_whbf_supported"])
+        whbf_en = self._bool_column(frame["whbf_en"])
+        hbf_en = by_sl_hbf_en | whbf_en
+
+        # PFRN capabilities
+        is_pfrn_sup = self._bool_column(frame["is_pfrn_supported"])
+        pfrn_en = self._bool_column(frame["pfrn_enabled"])
+
+        # Check for supported but not enabled features
+        issues = pd.Series("", index=frame.index, dtype=object)
+        issue_rules = (
+            (is_fr_sup & ~fr_en, "Fast Recovery supported but disabled"),
+            (is_hbf_sup & ~hbf_en, "HBF supported but disabled"),
+            (is_pfrn_sup & ~pfrn_en, "PFRN supported but disabled"),
+        )
+        for mask, message in issue_rules:
+            joined = issues.where(issues == "", issues + "; ") + message
+            issues = joined.where(mask, issues)
+
+        output = pd.DataFrame(
+            {
+                "NodeGUID": node_guids,
+                "NodeName": pd.Series(node_names, index=frame.index, dtype=object),
                 "ARNSupported": is_arn_sup,
                 "FRNSupported": is_frn_sup,
                 "FRSupported": is_fr_sup,
                 "FREnabled": fr_en,
                 "RNXmitEnabled": rn_xmit_en,
                 "HBFSupported": is_hbf_sup,
-                "HBFEnabled": by_sl_hbf_en or whbf_en,
+                "HBFEnabled": hbf_en,
                 "WHBFSupported": is_whbf_sup,
                 "WHBFEnabled": whbf_en,
                 "PFRNSupported": is_pfrn_sup,
                 "PFRNEnabled": pfrn_en,
-                "GroupCapacity": group_cap,
-                "GroupTop": group_top,
-                "SubGroupsActive": sub_grps_active,
-                "GlobalGroups": glb_groups,
-                "ARVersion": ar_version,
-                "RNVersion": rn_version,
-                "Severity": severity,
-                "Issues": "; ".join(issues) if issues else "",
-            }
-            records.append(record)
+                "GroupCapacity": self._int_column(frame["group_cap"]),
+                "GroupTop": self._int_column(frame["group_top"]),
+                "SubGroupsActive": self._int_column(frame["sub_grps_active"]),
+                "GlobalGroups": self._int_column(frame["glb_groups"]),
+                "ARVersion": self._int_column(frame["ar_version_cap"]),
+                "RNVersion": self._int_column(frame["rn_version_cap"]),
+                "Severity": np.where(issues != "", "info", "normal"),
+                "Issues": issues,
+            },
+            index=frame.index,
+        )
+        records = output.head(2000).to_dict("records")
 
         # Build summary
+        fr_supported = int(is_fr_sup.sum())
+        fr_enabled = int(fr_en.sum())
+        hbf_supported = int(is_hbf_sup.sum())
+        hbf_enabled = int(hbf_en.sum())
         summary = {
             "total_switches": len(ar_df),
-            "ar_supported": ar_supported,
+            "ar_supported": int((is_arn_sup | is_frn_sup).sum()),
             "fr_supported": fr_supported,
             "fr_enabled": fr_enabled,
             "hbf_supported": hbf_supported,
             "hbf_enabled": hbf_enabled,
-            "pfrn_supported": pfrn_supported,
-            "pfrn_enabled": pfrn_enabled,
+            "pfrn_supported": int(is_pfrn_sup.sum()),
+            "pfrn_enabled": int(pfrn_en.sum()),
             "fr_coverage_pct": round(fr_enabled / max(fr_supported, 1) * 100, 1),
             "hbf_coverage_pct": round(hbf_enabled / max(hbf_supported, 1) * 100, 1),
         }
 
-        return ArInfoResult(data=records[:2000], anomalies=None, summary=summary)
+        return ArInfoResult(data=records, anomalies=None, summary=summary)
 
     def _try_read_table(self, table_name: str) -> pd.DataFrame:
         try:
@@ -176,48 +171,36 @@ class ArInfoService:
             return pd.DataFrame()
 
     def _get_index_table(self) -> pd.DataFrame:
-        if self._index_cache is None:
-            db_csv = self._find_db_csv()
-            self._index_cache = read_index_table(db_csv)
-        return self._index_cache
+        return self._inventory.index_table
 
     def _read_table(self, table_name: str) -> pd.DataFrame:
         db_csv = self._find_db_csv()
         return read_table(db_csv, table_name, self._get_index_table())
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        return self._inventory.db_csv
 
     def _get_topology(self) -> Optional[TopologyLookup]:
         if self._topology is None:
             try:
-                self._topology = TopologyLookup(self.dataset_root)
+                self._topology = self._inventory.topology
             except Exception as e:
                 logger.debug(f"Could not load topology: {e}")
         return self._topology
 
     @staticmethod
-    def _safe_int(value: object) -> int:
-        try:
-            if pd.isna(value):
-                return 0
-            return int(float(value))
-        except (TypeError, ValueError):
-            return 0
+    def _bool_column(series: pd.Series) -> pd.Series:
+        """True for non-zero numbers and TRUE_TOKENS text; missing cells are False."""
+        if is_bool_dtype(series):
+            return series.fillna(False).astype(bool)
+        if is_numeric_dtype(series):
+            values = np.trunc(series.to_numpy(dtype=float, na_value=np.nan))
+            return pd.Series(np.nan_to_num(values, nan=0.0) != 0, index=series.index)
+        tokens = series.fillna("").astype(str).str.strip().str.lower()
+        return tokens.isin(TRUE_TOKENS).astype(bool)
 
     @staticmethod
-    def _safe_bool(value: object) -> bool:
-        try:
-            if pd.isna(value):
-                return False
-            if isinstance(value, bool):
-                return value
-            if isinstance(value, (int, float)):
-                return int(value) != 0
-            s = str(value).strip().lower()
-            return s in ("1", "true", "yes", "enabled")
-        except (TypeError, ValueError):
-            return False
+    def _int_column(series: pd.Series) -> pd.Series:
+        """Truncate a column to int, with unparseable or missing cells as 0."""
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        return pd.Series(np.nan_to_num(np.trunc(values), nan=0.0).astype(int), index=series.index)
@@ -2,17 +2,22 @@
 
 from __future__ import annotations
 
+import csv
+import io
 import logging
 import math
+import re
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from .anomalies import AnomlyType, IBH_ANOMALY_TBL_KEY
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 logger = logging.getLogger(__name__)
@@ -25,8 +30,57 @@ WARNING_SEVERITY = {
     "BER_RS_FEC_HIGH_ERRORS": "warning",
     "BER_NO_THRESHOLD_IS_SUPPORTED": "info",
 }
+# Every SymbolBERSeverity value, for both BER rows and warning rows
+BER_SEVERITY_DTYPE = pd.CategoricalDtype(["info", "normal", "warning", "critical"])
 SYMBOL_BER_SENTINEL_TEXT = "1.50E-254"
 SYMBOL_BER_SENTINEL_VALUE = 1.5e-254
+# Symbol BERs closer than this to the sentinel count as the sentinel
+SYMBOL_BER_SENTINEL_TOLERANCE = 1e-320
+# Anomaly weight per SymbolBERSeverity; any other severity weighs 0.0
+BER_SEVERITY_WEIGHT = {"critical": 1.0, "warning": 0.5}
+# Per-GUID text caches must hold every node of a large fabric (tens of thousands of
+# HCAs and switches), otherwise a full pass over the ports evicts entries it needs.
+GUID_CACHE_SIZE = 65536
+# Bare hex GUID text that _cached_normalize_guid_text prefixes without an int() parse
+HEX_DIGITS_RE = re.compile(r"[0-9a-fA-F]+")
+PM_COUNTER_KEY = ["NodeGUID", "PortNumber"]
+PM_SYMBOL_COUNTERS = ("SymbolErrorCounter", "SymbolErrorCounterExt")
+# PM tables that may carry the symbol error counters, in order of preference
+PM_COUNTER_TABLES = ("PM_DELTA", "PM_INFO", "PERFQUERY_EXT_ERRORS", "PM")
+# Linear BER values per port; a row without any of them has no BER data
+BER_VALUE_COLUMNS = ("RawBERValue", "EffectiveBERValue", "SymbolBERValue")
+# (text, linear value, log10) columns of the raw, effective and symbol BER, in that order
+BER_COLUMN_TRIPLES = (
+    ("Raw BER", "RawBERValue", "Log10 Raw BER"),
+    ("Effective BER", "EffectiveBERValue", "Log10 Effective BER"),
+    ("Symbol BER", "SymbolBERValue", "Log10 Symbol BER"),
+)
+# The only PM table columns the BER loader reads: port key (either spelling) plus counters
+PM_COUNTER_COLUMNS = ("NodeGuid", "NodeGUID", "PortNum", "PortNumber", *PM_SYMBOL_COUNTERS)
+BER_SOURCE_KEY = ["NodeGUID", "PortNumber"]
+# Columns where a PHY_DB16 value takes precedence over the net_dump_ext one
+BER_OVERRIDE_COLUMNS = (
+    "Raw BER",
+    "Effective BER",
+    "Symbol BER",
+    "RawBERValue",
+    "EffectiveBERValue",
+    "SymbolBERValue",
+    "Log10 Raw BER",
+    "Log10 Effective BER",
+    "Log10 Symbol BER",
+    "SymbolBERLog10Value",
+)
+# Mantissa/exponent pairs for the raw, effective and symbol BER, in that order
+PHY_DB16_BER_FIELDS = tuple(f"field{i}" for i in range(12, 18))
+# The only PHY_DB16 fields the BER loader reads: port key plus mantissa/exponent pairs
+PHY_DB16_COLUMNS = ("NodeGuid", "NodeGUID", "PortNum", "PortNumber", *PHY_DB16_BER_FIELDS)
+
+# Powers of ten for integral exponents, taken from math.pow so the column-wise
+# conversions round exactly like the scalar helpers (np.power can differ by an ulp).
+POW10_MIN_EXPONENT = -1000
+POW10_MAX_EXPONENT = 308
+POW10_TABLE = np.array([math.pow(10.0, k) for k in range(POW10_MIN_EXPONENT, POW10_MAX_EXPONENT + 1)])
 
 
 @dataclass
@@ -60,13 +114,13 @@ class BerService:
         "Log10 Raw BER",
     ]
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = dataset_root
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._df: pd.DataFrame | None = None
         self._warnings_df: pd.DataFrame | None = None
         self._topology: TopologyLookup | None = None
         self._pm_counters_df: pd.DataFrame | None = None
-        self._index_table: pd.DataFrame | None = None
         self._phy_db16_df: pd.DataFrame | None = None
 
     def clear_cache(self):
@@ -74,44 +128,57 @@ class BerService:
         self._df = None
         self._warnings_df = None
         self._topology = None
+        self._pm_counters_df = None
+        self._phy_db16_df = None
 
     def run(self) -> BerAnalysis:
         df = self._load_dataframe()
         warnings_df = self._load_warnings_dataframe()
         self._annotate_symbol_ber(df)
         self._annotate_warning_rows(warnings_df)
-        anomalies = self._build_anomalies(df, warnings_df)
         frames = []
         if not df.empty:
             frames.append(df)
         if warnings_df is not None and not warnings_df.empty:
             frames.append(warnings_df)
+        # Rows with a weighted severity are both the anomalies and the rows flagged
+        # in "IBH Anomaly", so find them once per frame.
+        weighted = [self._weighted_rows(frame) for frame in frames]
+        anomalies = self._build_anomalies(frames, weighted)
+        # Only the display columns reach the records (NodeGUID/PortNumber, which
+        # annotate_ports needs, are among them), so drop the raw BER and PM
+        # columns before concat and annotate_ports copy them.
+        display = set(self.DISPLAY_COLUMNS)
+        frames = [frame[[column for column in frame.columns if column in display]] for frame in frames]
 
         records: List[dict] = []
         if frames:
-            # Filter out empty or all-NA dataframes to avoid FutureWarning
-            non_empty_frames = [f for f in frames if not f.empty and not f.isna().all().all()]
-            if not non_empty_frames:
-                return []
-            combined = pd.concat(non_empty_frames, ignore_index=True, sort=False)
+            # Both frames are non-empty and every row carries a NodeGUID, so neither
+            # is all-NA and no per-cell scan is needed before concatenating.
+            combined = pd.concat(frames, ignore_index=True, sort=False)
             combined = self._topology_lookup().annotate_ports(combined, guid_col="NodeGUID", port_col="PortNumber")
-
-            severity_col = combined.get("SymbolBERSeverity")
-            if severity_col is not None:
-                combined["IBH Anomaly"] = severity_col.astype(str).str.lower().apply(
-                    lambda sev: AnomlyType.IBH_HIGH_SYMBOL_BER.value if sev in {"critical", "warning"} else ""
-                )
-            else:
-                combined["IBH Anomaly"] = ""
+            # annotate_ports keeps the row order, so the per-frame masks line up.
+            combined["IBH Anomaly"] = np.where(
+                np.concatenate(weighted), AnomlyType.IBH_HIGH_SYMBOL_BER.value, ""
+            ).tolist()
 
             for column in self.DISPLAY_COLUMNS:
                 if column not in combined.columns:
                     combined[column] = None
 
-            combined = combined[self.DISPLAY_COLUMNS]
-            records = combined.to_dict(orient="records")
+            records = self._to_records(combined, self.DISPLAY_COLUMNS)
         return BerAnalysis(data=records, anomalies=anomalies)
 
+    @staticmethod
+    def _to_records(frame: pd.DataFrame, columns: List[str]) -> List[dict]:
+        """Same rows as frame[columns].to_dict("records"), built column-wise.
+
+        Series.tolist() already yields native Python values, so zipping the
+        columns skips the per-cell boxing that to_dict does row by row.
+        """
+        values = [frame[column].tolist() for column in columns]
+        return [dict(zip(columns, row)) for row in zip(*values)]
+
     def _load_dataframe(self) -> pd.DataFrame:
         if self._df is not None:
             return self._df
@@ -122,10 +189,10 @@ class BerService:
 
         if not combined_df.empty:
             combined_df = self._ensure_numeric_ber_columns(combined_df)
-            combined_df = combined_df.dropna(
-                subset=["RawBERValue", "EffectiveBERValue", "SymbolBERValue"],
-                how="all"
-            )
+            combined_df = combined_df.dropna(subset=list(BER_VALUE_COLUMNS), how="all")
+            # The linear BER values only decide which ports have data; the records
+            # carry the formatted strings and log10 values, so drop them here.
+            combined_df = combined_df.drop(columns=list(BER_VALUE_COLUMNS))
             combined_df = self._merge_pm_counters(combined_df)
             self._df = combined_df
             return self._df
@@ -146,7 +213,8 @@ class BerService:
             self._warnings_df = pd.DataFrame()
             return self._warnings_df
         try:
-            warnings_df = read_table(db_csv, WARNINGS_TABLE, index_table)
+            # Only display columns survive run(); PortNum is renamed to one of them.
+            warnings_df = read_table(db_csv, WARNINGS_TABLE, index_table, usecols=[*self.DISPLAY_COLUMNS, "PortNum"])
         except Exception as exc:  # pragma: no cover
             logger.warning("Failed to read BER warnings table: %s", exc)
             self._warnings_df = pd.DataFrame()
@@ -155,22 +223,29 @@ class BerService:
             self._warnings_df = pd.DataFrame()
             return self._warnings_df
         warnings_df = warnings_df.rename(columns={"PortNum": "PortNumber"})
-        warnings_df["NodeGUID"] = warnings_df.apply(self._remove_redundant_zero, axis=1)
-        warnings_df["Summary"] = warnings_df["Summary"].astype(str).str.strip('"')
+        if "NodeGUID" in warnings_df.columns:
+            warnings_df["NodeGUID"] = TopologyLookup.normalize_guid_column(warnings_df["NodeGUID"])
+        else:
+            warnings_df["NodeGUID"] = ""
+        # Summaries repeat per event type, so strip the quotes once per distinct text.
+        codes, summaries = pd.factorize(warnings_df["Summary"].astype(str))
+        warnings_df["Summary"] = pd.Series(
+            summaries.str.strip('"').take(codes, fill_value=np.nan), index=warnings_df.index
+        )
+        if "EventName" in warnings_df.columns:
+            # A handful of event types repeat on every row; the severity map in
+            # _annotate_warning_rows then runs once per category.
+            warnings_df["EventName"] = warnings_df["EventName"].astype("category")
         self._warnings_df = warnings_df
         return self._warnings_df
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        """db_csv path, globbed once per dataset by the shared inventory."""
+        return self._inventory.db_csv
 
     def _get_index_table(self) -> pd.DataFrame:
-        if self._index_table is None:
-            db_csv = self._find_db_csv()
-            self._index_table = read_index_table(db_csv)
-        return self._index_table
+        """Index table, parsed once per dataset by the shared inventory."""
+        return self._inventory.index_table
 
     def _load_pm_counters(self) -> pd.DataFrame:
         if self._pm_counters_df is not None:
@@ -183,12 +258,9 @@ class BerService:
 
         index_table = self._get_index_table()
         pm_df = pd.DataFrame()
-        candidate_tables = ("PM_DELTA", "PM_INFO", "PERFQUERY_EXT_ERRORS", "PM")
-        for table in candidate_tables:
-            if table not in index_table.index:
-                continue
+        for table in [table for table in PM_COUNTER_TABLES if table in index_table.index]:
             try:
-                pm_df = read_table(db_csv, table, index_table)
+                pm_df = read_table(db_csv, table, index_table, usecols=PM_COUNTER_COLUMNS)
                 if not pm_df.empty:
                     break
             except Exception:  # pragma: no cover - corrupt table should not crash
@@ -209,7 +281,7 @@ class BerService:
 
         keep_cols = ["NodeGUID", "PortNumber"]
         has_symbol_counter = False
-        for column in ("SymbolErrorCounter", "SymbolErrorCounterExt"):
+        for column in PM_SYMBOL_COUNTERS:
             if column in pm_df.columns:
                 keep_cols.append(column)
                 has_symbol_counter = True
@@ -217,12 +289,14 @@ class BerService:
             self._pm_counters_df = pd.DataFrame()
             return self._pm_counters_df
 
+        pm_df = pm_df[keep_cols].assign(
+            NodeGUID=pm_df["NodeGUID"].astype(str).map(self._cached_normalize_guid_text)
+        )
+        # Dedupe on the normalized key and index by it so the merge is a plain join
         pm_df = (
-            pm_df[keep_cols]
-            .drop_duplicates(subset=["NodeGUID", "PortNumber"], keep="last")
-            .copy()
+            pm_df.drop_duplicates(subset=PM_COUNTER_KEY, keep="last")
+            .set_index(PM_COUNTER_KEY)
         )
-        pm_df["NodeGUID"] = pm_df["NodeGUID"].astype(str).apply(self._normalize_guid_text)
         self._pm_counters_df = pm_df
         return self._pm_counters_df
 
@@ -234,86 +308,76 @@ class BerService:
             df["SymbolErrorCounter"] = 0
             df["SymbolErrorCounterExt"] = 0
             return df
-        merged = df.merge(pm_df, how="left", on=["NodeGUID", "PortNumber"])
-
-        # Use vectorized operations instead of apply for better performance
-        for column in ("SymbolErrorCounter", "SymbolErrorCounterExt"):
-            if column in merged.columns:
-                merged[column] = pd.to_numeric(merged[column], errors="coerce").fillna(0).clip(lower=0).astype("int64")
-            else:
-                merged[column] = 0
-
-        if "Symbol Err" not in merged.columns:
-            merged["Symbol Err"] = 0
+        merged = df.join(pm_df, on=PM_COUNTER_KEY, how="left").reset_index(drop=True)
+
+        # Coerce the PM counters as one block, each downcast to the smallest int
+        # dtype that holds it; "Symbol Err" is not clipped, so a negative value
+        # from the dump is kept as reported.
+        counter_columns = [column for column in PM_SYMBOL_COUNTERS if column in merged.columns]
+        if counter_columns:
+            merged[counter_columns] = (
+                merged[counter_columns]
+                .apply(pd.to_numeric, errors="coerce")
+                .fillna(0)
+                .clip(lower=0)
+                .astype("int64")
+                .apply(pd.to_numeric, downcast="integer")
+            )
+        missing = [column for column in (*PM_SYMBOL_COUNTERS, "Symbol Err") if column not in merged.columns]
+        if missing:
+            merged = merged.assign(**dict.fromkeys(missing, 0))
         merged["Symbol Err"] = pd.to_numeric(merged["Symbol Err"], errors="coerce").fillna(0).astype("int64")
         return merged
 
-    @staticmethod
-    @lru_cache(maxsize=10000)
-    def _cached_remove_redundant_zero(guid: str) -> str:
-        """Cached version of _remove_redundant_zero to handle repeated values."""
-        if guid.startswith("0x"):
-            try:
-                return hex(int(guid, 16))
-            except (ValueError, OverflowError):
-                logger.warning(f"Invalid hex GUID format: {guid}")
-                return guid
-        return guid
-
-    @staticmethod
-    def _remove_redundant_zero(row) -> str:
-        """Remove redundant zeros from GUID. Can handle both dict/row and string."""
-        # Handle when called with a string value directly (from Series.apply)
-        if isinstance(row, str):
-            return BerService._cached_remove_redundant_zero(row)
-        # Handle when called with a dict/row object
-        elif isinstance(row, dict) or hasattr(row, "get"):
-            guid = str(row.get("NodeGUID", ""))
-            return BerService._cached_remove_redundant_zero(guid)
-        else:
-            guid = str(row)
-            return BerService._cached_remove_redundant_zero(guid)
-
     def _annotate_symbol_ber(self, df: pd.DataFrame) -> None:
         if df.empty:
             return
+        if "SymbolBERSeverity" in df.columns:
+            # The cached frame was already annotated by an earlier run(); the pass is
+            # idempotent, so repeating it would only recompute the same columns.
+            return
         log_series = df.get("SymbolBERLog10Value")
         if log_series is None:
             log_series = pd.to_numeric(df.get("Log10 Symbol BER"), errors="coerce")
             df["SymbolBERLog10Value"] = log_series
 
-        def to_value(log_value):
-            if pd.isna(log_value):
-                return None
-            return math.pow(10, log_value)
-
-        df["SymbolBERValue"] = log_series.apply(to_value)
+        log_values = pd.to_numeric(log_series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
         df["SymbolBERThreshold"] = SYMBOL_BER_SENTINEL_VALUE
 
-        def requires_warning(row: pd.Series) -> bool:
-            text_value = str(row.get("Symbol BER", "") or "").strip()
-            numeric_value: Optional[float] = None
-            if text_value:
+        # A non-empty "Symbol BER" text wins over the log-derived value; text that
+        # does not parse as a number always needs a warning.
+        # Each distinct text is parsed once; the extra last slot stands for NaN
+        # cells, which read as the text "nan" just like str(nan) would.
+        text_column = df.get("Symbol BER")
+        numeric = np.power(10.0, log_values)
+        unparsed = np.zeros(len(df), dtype=bool)
+        if text_column is not None:
+            raw_values = text_column.to_numpy(dtype=object)
+            codes, distinct = pd.factorize(raw_values)
+            text_numeric = np.full(len(distinct) + 1, np.nan)
+            text_given = np.ones(len(distinct) + 1, dtype=bool)
+            text_unparsed = np.zeros(len(distinct) + 1, dtype=bool)
+            for code, raw in enumerate(distinct.tolist()):
+                text_value = str(raw or "").strip()
+                if not text_value:
+                    text_given[code] = False
+                    continue
                 try:
-                    numeric_value = float(text_value)
+                    text_numeric[code] = float(text_value)
                 except (TypeError, ValueError):
-                    numeric_value = None
-                if numeric_value is None:
-                    return text_value.upper() != SYMBOL_BER_SENTINEL_TEXT
-            if numeric_value is None:
-                numeric_value = row.get("SymbolBERValue")
-            if numeric_value is None or pd.isna(numeric_value):
-                return False
-            return not math.isclose(
-                numeric_value,
-                SYMBOL_BER_SENTINEL_VALUE,
-                rel_tol=0.0,
-                abs_tol=1e-320,
-            )
-
-        df["SymbolBERSeverity"] = df.apply(
-            lambda row: "warning" if requires_warning(row) else "normal",
-            axis=1,
+                    text_unparsed[code] = text_value.upper() != SYMBOL_BER_SENTINEL_TEXT
+            codes[codes < 0] = len(distinct)
+            given = text_given[codes] & (raw_values != None)  # noqa: E711 - elementwise
+            numeric[given] = text_numeric[codes[given]]
+            unparsed = text_unparsed[codes]
+        with np.errstate(invalid="ignore"):
+            off_sentinel = ~(np.abs(numeric - SYMBOL_BER_SENTINEL_VALUE) <= SYMBOL_BER_SENTINEL_TOLERANCE)
+        requires_warning = unparsed | (~np.isnan(numeric) & off_sentinel)
+        # Built from category codes, so no per-row severity string is created;
+        # _annotate_raw_effective_ber escalates on the same codes.
+        rank = BER_SEVERITY_DTYPE.categories.get_loc
+        df["SymbolBERSeverity"] = pd.Categorical.from_codes(
+            np.where(requires_warning, rank("warning"), rank("normal")), dtype=BER_SEVERITY_DTYPE
         )
 
         self._annotate_raw_effective_ber(df)
@@ -322,54 +386,65 @@ class BerService:
         if df.empty:
             return
 
-        symbol_err = (
-            pd.to_numeric(df.get("Symbol Err"), errors="coerce").fillna(0).astype("int64")
+        # Error counts mostly stay small, so store them in the narrowest int dtype
+        symbol_err = pd.to_numeric(
+            pd.to_numeric(df.get("Symbol Err"), errors="coerce").fillna(0).astype("int64"), downcast="integer"
         )
-        effective_err = (
-            pd.to_numeric(df.get("Effective Err"), errors="coerce").fillna(0).astype("int64")
+        effective_err = pd.to_numeric(
+            pd.to_numeric(df.get("Effective Err"), errors="coerce").fillna(0).astype("int64"), downcast="integer"
         )
         df["Symbol Err"] = symbol_err
         df["Effective Err"] = effective_err
 
-        def classify_row(row):
-            severity = row.get("SymbolBERSeverity", "normal") or "normal"
-            symbol_count = int(row.get("Symbol Err", 0) or 0)
-            if symbol_count > 0:
-                return self._max_severity(severity, "critical")
-            if row.get("BerWarning"):
-                return self._max_severity(severity, "warning")
-            return severity
-
-        df["SymbolBERSeverity"] = df.apply(classify_row, axis=1)
-        df.drop(columns=["_TotalSymbolErrors"], inplace=True, errors="ignore")
+        # Escalate by precedence on the ordered category codes: a BER warning flag
+        # raises anything below warning to warning, symbol errors make a port
+        # critical. Severities outside the categories (code -1) stay missing.
+        rank = BER_SEVERITY_DTYPE.categories.get_loc
+        codes = pd.Categorical(df["SymbolBERSeverity"], dtype=BER_SEVERITY_DTYPE).codes
+        if "BerWarning" in df.columns:
+            ber_warning = df["BerWarning"].to_numpy(dtype=object).astype(bool)
+            codes = np.where(ber_warning, np.maximum(codes, rank("warning")), codes)
+        codes = np.where(symbol_err.to_numpy() > 0, rank("critical"), codes)
+        df["SymbolBERSeverity"] = pd.Categorical.from_codes(codes, dtype=BER_SEVERITY_DTYPE)
 
     def _annotate_warning_rows(self, warnings_df: pd.DataFrame | None) -> None:
         if warnings_df is None or warnings_df.empty:
             return
-        severity = warnings_df["EventName"].map(lambda name: WARNING_SEVERITY.get(name, "info"))
-        warnings_df["SymbolBERSeverity"] = severity
+        # The mapped dtype depends on which event names occur (category, str or
+        # all-NaN float), so cast before filling to fill on the category codes.
+        severity = warnings_df["EventName"].map(WARNING_SEVERITY).astype(BER_SEVERITY_DTYPE)
+        warnings_df["SymbolBERSeverity"] = severity.fillna("info")
         warnings_df["SymbolBERLog10Value"] = None
         warnings_df["SymbolBERThreshold"] = None
         warnings_df["BerWarning"] = True
 
-    def _build_anomalies(self, df: pd.DataFrame, warnings_df: pd.DataFrame | None) -> pd.DataFrame:
-        severity_map = {"critical": 1.0, "warning": 0.5}
-        frames = []
-        if not df.empty and "SymbolBERSeverity" in df.columns:
-            frames.append(df[IBH_ANOMALY_TBL_KEY + ["SymbolBERSeverity"]].copy())
-        if warnings_df is not None and not warnings_df.empty:
-            frames.append(warnings_df[IBH_ANOMALY_TBL_KEY + ["SymbolBERSeverity"]].copy())
-        if not frames:
+    @staticmethod
+    def _weighted_rows(frame: pd.DataFrame) -> np.ndarray:
+        """Mask of the rows whose SymbolBERSeverity carries an anomaly weight."""
+        if "SymbolBERSeverity" not in frame.columns:
+            return np.zeros(len(frame), dtype=bool)
+        return frame["SymbolBERSeverity"].isin(BER_SEVERITY_WEIGHT).to_numpy()
+
+    def _build_anomalies(self, frames: List[pd.DataFrame], weighted: List[np.ndarray]) -> pd.DataFrame:
+        # Severities outside BER_SEVERITY_WEIGHT weigh 0.0 and are dropped when the
+        # anomalies are flattened, so keep only the weighted rows. concat builds new
+        # blocks anyway, so the selections need no copy.
+        payloads = [
+            frame.loc[mask, IBH_ANOMALY_TBL_KEY + ["SymbolBERSeverity"]]
+            for frame, mask in zip(frames, weighted)
+            if mask.any()
+        ]
+        if not payloads:
             return pd.DataFrame(columns=IBH_ANOMALY_TBL_KEY)
-        payload = pd.concat(frames, ignore_index=True)
-        payload[str(AnomlyType.IBH_HIGH_SYMBOL_BER)] = payload["SymbolBERSeverity"].map(
-            lambda sev: severity_map.get(sev, 0.0)
+        payload = pd.concat(payloads, ignore_index=True)
+        payload[str(AnomlyType.IBH_HIGH_SYMBOL_BER)] = (
+            payload["SymbolBERSeverity"].map(BER_SEVERITY_WEIGHT).astype(float).fillna(0.0)
         )
         return payload[IBH_ANOMALY_TBL_KEY + [str(AnomlyType.IBH_HIGH_SYMBOL_BER)]]
 
     def _topology_lookup(self) -> TopologyLookup:
         if self._topology is None:
-            self._topology = TopologyLookup(self.dataset_root)
+            self._topology = self._inventory.topology
         return self._topology
 
     def _parse_net_dump_file(self) -> pd.DataFrame:
@@ -378,54 +453,80 @@ class BerService:
         if not net_dump_files:
             return pd.DataFrame()
 
-        records: List[Dict[str, object]] = []
+        lines: List[str] = []
         for file_path in net_dump_files:
             try:
                 with open(file_path, "r", encoding="latin-1") as handle:
-                    for line in handle:
-                        stripped = line.strip()
-                        if not stripped or stripped.startswith("#"):
-                            continue
-                        if not (stripped.startswith("CA") or stripped.startswith("SW")):
-                            continue
-                        parts = [part.strip() for part in stripped.split(":")]
-                        if len(parts) < 15:
-                            continue
-                        try:
-                            port_number = int(parts[2])
-                        except ValueError:
-                            continue
-                        try:
-                            raw = parts[12]
-                            eff = parts[13]
-                            sym = parts[14]
-                            sym_err = parts[15] if len(parts) > 15 else "0"
-                            eff_err = parts[16] if len(parts) > 16 else "0"
-                        except IndexError:
-                            continue
-                        node_guid = self._normalize_guid_text(parts[3])
-                        node_name = parts[17].strip('"') if len(parts) > 17 else parts[3]
-                        lid_value = self._extract_numeric_token(parts[4])
-                        peer_lid_value = self._extract_numeric_token(parts[9])
-                        records.append(
-                            {
-                                "NodeGUID": node_guid,
-                                "PortNumber": port_number,
-                                "Node Name": node_name,
-                                "Attached To": parts[9],
-                                "LID": lid_value,
-                                "Peer LID": peer_lid_value,
-                                "Raw BER": raw,
-                                "Effective BER": eff,
-                                "Symbol BER": sym,
-                                "Symbol Err": self._parse_int_token(sym_err),
-                                "Effective Err": self._parse_int_token(eff_err),
-                            }
-                        )
+                    text = handle.read()
             except OSError:
                 continue
+            # Blank and "#" comment lines fail the CA/SW prefix test as well.
+            stripped_lines = (line.strip() for line in text.split("\n"))
+            lines.extend(line for line in stripped_lines if line.startswith(("CA", "SW")))
+        if not lines:
+            return pd.DataFrame()
+
+        # Let the C parser split the fields. It pads short lines with empty strings,
+        # so keep each line's own field count to tell missing fields apart.
+        field_counts = np.fromiter((line.count(":") for line in lines), dtype=np.int64, count=len(lines)) + 1
+        fields = pd.read_csv(
+            io.StringIO("\n".join(lines)),
+            sep=":",
+            header=None,
+            names=range(max(int(field_counts.max()), 18)),
+            dtype=str,
+            quoting=csv.QUOTE_NONE,
+            na_filter=False,
+            engine="c",
+        )
+
+        def field(index: int, parse: Optional[Callable[[Optional[str]], object]] = None) -> List[object]:
+            """Stripped (and optionally parsed) values of one field, None where missing.
+
+            Dump fields repeat heavily, so each distinct raw token is handled once.
+            """
+            codes, distinct = pd.factorize(fields[index])
+            values = [token.strip() for token in distinct.tolist()]
+            missing = field_counts <= index
+            if parse is not None:
+                values = [parse(value) for value in values]
+                values.append(parse(None) if missing.any() else None)
+            else:
+                values.append(None)
+            codes[missing] = len(values) - 1
+            return np.array(values, dtype=object)[codes].tolist()
 
-        return pd.DataFrame(records)
+        port_numbers = field(2, self._int_or_none)
+        keep = (field_counts >= 15) & np.array([port is not None for port in port_numbers])
+        if not keep.any():
+            return pd.DataFrame()
+        if not keep.all():
+            fields = fields[keep].reset_index(drop=True)
+            field_counts = field_counts[keep]
+            port_numbers = field(2, int)
+
+        # Trailing fields missing from a line read as None, which the token parsers
+        # treat like an explicit "0".
+        node_guids = field(3)
+        attached_to = field(9)
+        return pd.DataFrame(
+            {
+                "NodeGUID": field(3, self._cached_normalize_guid_text),
+                "PortNumber": port_numbers,
+                "Node Name": [
+                    name if name is not None else guid
+                    for name, guid in zip(field(17, self._strip_quotes), node_guids)
+                ],
+                "Attached To": attached_to,
+                "LID": field(4, self._extract_numeric_token),
+                "Peer LID": field(9, self._extract_numeric_token),
+                "Raw BER": field(12),
+                "Effective BER": field(13),
+                "Symbol BER": field(14),
+                "Symbol Err": field(15, self._parse_int_token),
+                "Effective Err": field(16, self._parse_int_token),
+            }
+        )
 
     def _load_phy_db16_dataframe(self) -> pd.DataFrame:
         if self._phy_db16_df is not None:
@@ -442,7 +543,7 @@ class BerService:
             return self._phy_db16_df
 
         try:
-            phy_df = read_table(self._find_db_csv(), "PHY_DB16", index_table)
+            phy_df = read_table(self._find_db_csv(), "PHY_DB16", index_table, usecols=PHY_DB16_COLUMNS)
         except Exception as exc:  # pragma: no cover - corrupt dataset
             logger.warning("Failed to read PHY_DB16 table: %s", exc)
             self._phy_db16_df = pd.DataFrame()
@@ -453,37 +554,64 @@ class BerService:
             return self._phy_db16_df
 
         phy_df = phy_df.rename(columns={"NodeGuid": "NodeGUID", "PortNum": "PortNumber"})
-        phy_df["NodeGUID"] = phy_df.apply(self._remove_redundant_zero, axis=1)
+        if "NodeGUID" not in phy_df.columns:
+            phy_df["NodeGUID"] = ""
         phy_df["PortNumber"] = pd.to_numeric(phy_df["PortNumber"], errors="coerce")
-        phy_df = phy_df.dropna(subset=["NodeGUID", "PortNumber"])
+        phy_df = phy_df.dropna(subset=["PortNumber"])
+
+        # Parse each mantissa/exponent field once and stack the three pairs (one
+        # per BER_COLUMN_TRIPLES entry) as (3, rows) arrays, so the filter, the scaling and the log10 below each
+        # run as a single pass over all three BERs.
+        parsed_fields = [self._float_values(phy_df.get(field_col), len(phy_df)) for field_col in PHY_DB16_BER_FIELDS]
+        field_values = np.stack([values for values, _ in parsed_fields]).reshape(len(BER_COLUMN_TRIPLES), 2, len(phy_df))
+        field_parsed = np.stack([parsed for _, parsed in parsed_fields]).reshape(len(BER_COLUMN_TRIPLES), 2, len(phy_df))
+
+        # Healthy ports report a zero mantissa for all three BERs. Such rows yield no
+        # BER value and are dropped after the merge anyway, so skip them up front.
+        has_ber = (field_parsed[:, 0] & (field_values[:, 0] != 0)).any(axis=0)
+        if not has_ber.all():
+            phy_df = phy_df[has_ber]
+            field_values = field_values[:, :, has_ber]
+            field_parsed = field_parsed[:, :, has_ber]
 
-        records: List[Dict[str, object]] = []
-        mappings = [
-            ("Raw BER", "RawBERValue", "Log10 Raw BER", "field12", "field13"),
-            ("Effective BER", "EffectiveBERValue", "Log10 Effective BER", "field14", "field15"),
-            ("Symbol BER", "SymbolBERValue", "Log10 Symbol BER", "field16", "field17"),
-        ]
-
-        for _, row in phy_df.iterrows():
-            node_guid = row["NodeGUID"]
-            port_number = int(row["PortNumber"])
-            payload = {"NodeGUID": node_guid, "PortNumber": port_number}
-            for string_col, value_col, log_col, mantissa_col, exponent_col in mappings:
-                mantissa = row.get(mantissa_col)
-                exponent = row.get(exponent_col)
-                value = self._mantissa_exponent_to_value(mantissa, exponent)
-                payload[value_col] = value
-                if value is not None:
-                    payload[string_col] = self._format_ber_value(value)
-                    payload[log_col] = self._safe_log10(value)
-            payload["SymbolBERLog10Value"] = payload.get("Log10 Symbol BER")
-            records.append(payload)
-
-        if not records:
+        if phy_df.empty:
             self._phy_db16_df = pd.DataFrame()
             return self._phy_db16_df
 
-        self._phy_db16_df = pd.DataFrame(records)
+        columns: Dict[str, object] = {
+            "NodeGUID": TopologyLookup.normalize_guid_column(phy_df["NodeGUID"]),
+            "PortNumber": np.trunc(phy_df["PortNumber"].to_numpy(dtype=float)).astype(np.int64),
+        }
+        values, present = self._mantissa_exponent_to_values(
+            (field_values[:, 0], field_parsed[:, 0]), (field_values[:, 1], field_parsed[:, 1])
+        )
+        # The three BER columns share most of their values (the symbol BER sentinel
+        # in particular), so format them as one batch and split the strings back.
+        # Boolean indexing walks the rows in order, i.e. raw, effective, symbol.
+        formatted = self._format_ber_values(values[present])
+        formatted_columns = np.split(formatted, np.cumsum(present.sum(axis=1))[:-1])
+        # _safe_log10 semantics: None for non-positive values, NaN passes through.
+        logs = np.full(values.shape, np.nan)
+        np.log10(values, out=logs, where=values > 0)
+        no_log = values <= 0
+
+        symbol_log: object = None
+        for (string_col, value_col, log_col), row_values, row_present, row_logs, row_no_log, column_strings in zip(
+            BER_COLUMN_TRIPLES, values, present, logs, no_log, formatted_columns
+        ):
+            columns[value_col] = self._float_column(row_values, ~row_present)
+            if not row_present.any():
+                continue
+            # Rows without a value leave these columns missing (NaN), as before.
+            strings = np.full(len(row_values), np.nan, dtype=object)
+            strings[row_present] = column_strings
+            columns[string_col] = strings.tolist()
+            columns[log_col] = self._float_column(np.where(row_present, row_logs, np.nan), row_present & row_no_log)
+            if log_col == "Log10 Symbol BER":
+                symbol_log = self._float_column(row_logs, ~row_present | row_no_log)
+        columns["SymbolBERLog10Value"] = symbol_log if symbol_log is not None else [None] * len(phy_df)
+
+        self._phy_db16_df = pd.DataFrame(columns)
         return self._phy_db16_df
 
     def _combine_ber_sources(self, net_dump_df: pd.DataFrame, phy_df: pd.DataFrame) -> pd.DataFrame:
@@ -499,34 +627,21 @@ class BerService:
         if phy_df is None or phy_df.empty:
             return net_dump_df
 
-        net = net_dump_df.set_index(["NodeGUID", "PortNumber"])
-        phy = phy_df.set_index(["NodeGUID", "PortNumber"])
-        combined_index = net.index.union(phy.index)
-        net = net.reindex(combined_index)
-        phy = phy.reindex(combined_index)
-        merged = net.copy()
-
-        for column in phy.columns:
-            if column not in merged.columns:
+        # One outer hash join replaces set_index/reindex on both frames. PHY_DB16
+        # values win for the BER columns; any other overlapping column keeps the
+        # net_dump value, and PHY-only columns outside the override list stay empty.
+        merged = net_dump_df.merge(phy_df, how="outer", on=BER_SOURCE_KEY, suffixes=("", "_phy"), sort=True)
+        for column in phy_df.columns:
+            if column in BER_SOURCE_KEY:
+                continue
+            if column in net_dump_df.columns:
+                phy_values = merged.pop(f"{column}_phy")
+                if column in BER_OVERRIDE_COLUMNS:
+                    merged[column] = phy_values.combine_first(merged[column])
+            elif column in BER_OVERRIDE_COLUMNS:
+                merged[column] = merged[column].astype(object).where(merged[column].notna(), None)
+            else:
                 merged[column] = None
-
-        override_columns = [
-            "Raw BER",
-            "Effective BER",
-            "Symbol BER",
-            "RawBERValue",
-            "EffectiveBERValue",
-            "SymbolBERValue",
-            "Log10 Raw BER",
-            "Log10 Effective BER",
-            "Log10 Symbol BER",
-            "SymbolBERLog10Value",
-        ]
-        for column in override_columns:
-            if column in phy.columns:
-                merged[column] = phy[column].combine_first(merged[column])
-
-        merged = merged.reset_index()
         for column in ("Symbol Err", "Effective Err"):
             if column not in merged.columns:
                 merged[column] = 0
@@ -537,21 +652,10 @@ class BerService:
         return merged
 
     def _ensure_numeric_ber_columns(self, df: pd.DataFrame) -> pd.DataFrame:
-        column_map = [
-            ("Raw BER", "RawBERValue", "Log10 Raw BER"),
-            ("Effective BER", "EffectiveBERValue", "Log10 Effective BER"),
-            ("Symbol BER", "SymbolBERValue", "Log10 Symbol BER"),
-        ]
-        for string_col, value_col, log_col in column_map:
+        for string_col, value_col, log_col in BER_COLUMN_TRIPLES:
             if string_col not in df.columns:
                 df[string_col] = None
-            existing_values = pd.to_numeric(df.get(value_col), errors="coerce")
-            needs_recalc = existing_values.isna()
-            if needs_recalc.any():
-                parsed = df.loc[needs_recalc, string_col].apply(self._parse_ber_string)
-                existing_values.loc[needs_recalc] = parsed
-            df[value_col] = existing_values
-            df[log_col] = df[value_col].apply(self._safe_log10)
+            df[value_col], df[log_col] = self._parse_ber_values(df.get(value_col), df[string_col])
 
         if "SymbolBERLog10Value" not in df.columns:
             df["SymbolBERLog10Value"] = df["Log10 Symbol BER"]
@@ -570,6 +674,17 @@ class BerService:
         token = text.split()[0]
         return token or None
 
+    @staticmethod
+    def _int_or_none(text: Optional[str]) -> Optional[int]:
+        try:
+            return int(text)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _strip_quotes(text: Optional[str]) -> Optional[str]:
+        return text.strip('"') if text is not None else None
+
     @staticmethod
     def _parse_int_token(value: object) -> int:
         token = BerService._extract_numeric_token(value)
@@ -583,12 +698,14 @@ class BerService:
             return 0
 
     @staticmethod
-    @lru_cache(maxsize=10000)
+    @lru_cache(maxsize=GUID_CACHE_SIZE)
     def _cached_normalize_guid_text(value: str) -> str:
         """Cached version of _normalize_guid_text."""
         text = value.strip()
         if text.lower().startswith("0x"):
             return text.lower()
+        if HEX_DIGITS_RE.fullmatch(text):
+            return f"0x{text.lower()}"
         try:
             int(text, 16)
             return f"0x{text.lower()}"
@@ -599,6 +716,37 @@ class BerService:
     def _normalize_guid_text(value: str) -> str:
         return BerService._cached_normalize_guid_text(value)
 
+    @staticmethod
+    def _parse_ber_values(values: Optional[pd.Series], texts: pd.Series) -> Tuple[pd.Series, pd.Series]:
+        """Linear and log10 BER columns: numeric values, else the parsed BER text.
+
+        Both passes run column-wise, once per distinct text or value.
+        """
+        if values is None:
+            # net_dump_ext-only datasets carry the BER text alone
+            parsed = pd.Series(np.nan, index=texts.index)
+        else:
+            parsed = pd.to_numeric(values, errors="coerce")
+        needs_recalc = parsed.isna()
+        if needs_recalc.any():
+            parsed.loc[needs_recalc] = BerService._parse_ber_column(texts[needs_recalc])
+        return parsed, BerService._log10_column(parsed)
+
+    @staticmethod
+    def _parse_ber_column(series: pd.Series) -> pd.Series:
+        """Column-wise _parse_ber_string as floats (NaN where unparsed), once per distinct text."""
+        codes, distinct = pd.factorize(series)
+        text = distinct.astype(str).str.strip()
+        blank = (text == "") | (text.str.lower() == "na")
+        try:
+            # numpy's string cast parses exactly like float(); pd.to_numeric does
+            # not always round to the nearest double.
+            table = np.asarray(text.where(~blank, "nan"), dtype=np.str_).astype(float)
+        except ValueError:
+            parsed = [BerService._parse_ber_string(value) for value in distinct.tolist()]
+            table = np.array([np.nan if value is None else value for value in parsed], dtype=float)
+        return pd.Series(np.append(table, np.nan)[codes], index=series.index)
+
     @staticmethod
     def _parse_ber_string(value: object) -> Optional[float]:
         if value is None:
@@ -619,6 +767,20 @@ class BerService:
             return None
         return math.log10(value)
 
+    @staticmethod
+    def _log10_column(series: pd.Series) -> pd.Series:
+        """Column-wise _safe_log10 over a numeric column, one math.log10 per distinct value."""
+        if series.empty:
+            return series.astype(float)
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        distinct, inverse = np.unique(values, return_inverse=True)
+        logs = [BerService._safe_log10(value) for value in distinct.tolist()]
+        if all(log is None for log in logs):
+            # Series.apply leaves an all-None result as an object column
+            return pd.Series([None] * len(values), index=series.index, dtype=object)
+        table = np.array([np.nan if log is None else log for log in logs])
+        return pd.Series(table[inverse], index=series.index)
+
     @staticmethod
     def _mantissa_exponent_to_value(mantissa: object, exponent: object) -> Optional[float]:
         try:
@@ -637,6 +799,103 @@ class BerService:
         except OverflowError:
             return None
 
+    @staticmethod
+    def _float_values(series: Optional[pd.Series], length: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (values, parsed) where parsed marks entries float() accepts."""
+        if series is None:
+            return np.full(length, np.nan), np.zeros(length, dtype=bool)
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf":
+            return series.to_numpy(dtype=float), np.ones(length, dtype=bool)
+        # Text columns repeat a few tokens, so float() each distinct one once. Missing
+        # cells (code -1, the extra last slot) are tried individually: float(nan)
+        # parses, float(None) does not.
+        codes, distinct = pd.factorize(series)
+        table_values = np.full(len(distinct) + 1, np.nan)
+        table_parsed = np.zeros(len(distinct) + 1, dtype=bool)
+        for code, item in enumerate(distinct.tolist()):
+            try:
+                table_values[code] = float(item)
+            except (TypeError, ValueError):
+                continue
+            table_parsed[code] = True
+        values = table_values[codes]
+        parsed = table_parsed[codes]
+        for position in np.flatnonzero(codes < 0).tolist():
+            try:
+                values[position] = float(series.iat[position])
+            except (TypeError, ValueError):
+                continue
+            parsed[position] = True
+        return values, parsed
+
+    @staticmethod
+    def _mantissa_exponent_to_values(
+        mantissa: Tuple[np.ndarray, np.ndarray], exponent: Tuple[np.ndarray, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Column-wise _mantissa_exponent_to_value over _float_values results; returns (values, present)."""
+        mantissa_values, mantissa_parsed = mantissa
+        exponent_values, exponent_parsed = exponent
+        scale = BerService._pow10(-exponent_values)
+        with np.errstate(invalid="ignore"):
+            values = mantissa_values * scale
+        # math.pow raises OverflowError where np.power returns inf for a finite exponent.
+        overflow = np.isinf(scale) & np.isfinite(exponent_values)
+        present = (
+            mantissa_parsed
+            & exponent_parsed
+            & (mantissa_values != 0)
+            & ~(exponent_values > 1000)
+            & ~overflow
+        )
+        return values, present
+
+    @staticmethod
+    def _float_column(values: np.ndarray, missing: np.ndarray) -> object:
+        """values with None at the missing positions, as a DataFrame column.
+
+        Typed the way pandas infers such a list (float64 with NaN, or object when
+        every entry is None) without boxing each float into a list first.
+        """
+        if missing.all():
+            return [None] * len(values)
+        return np.where(missing, np.nan, values)
+
+    @staticmethod
+    def _pow10(exponents: np.ndarray) -> np.ndarray:
+        """10 ** exponents, read from POW10_TABLE wherever the exponent is integral."""
+        with np.errstate(over="ignore", invalid="ignore"):
+            result = np.power(10.0, exponents)
+        tabled = (
+            (exponents == np.floor(exponents))
+            & (exponents >= POW10_MIN_EXPONENT)
+            & (exponents <= POW10_MAX_EXPONENT)
+        )
+        result[tabled] = POW10_TABLE[exponents[tabled].astype(np.int64) - POW10_MIN_EXPONENT]
+        return result
+
+    @staticmethod
+    def _format_ber_values(values: np.ndarray) -> np.ndarray:
+        """Column-wise _format_ber_value over a float array; returns an object array."""
+        strings = np.full(len(values), "N/A", dtype=object)
+        strings[values == 0] = "0.00E+00"
+        positive = np.isfinite(values) & (values > 0)
+        if positive.any():
+            # Ports repeat a handful of mantissa/exponent pairs, so format each
+            # distinct value once and scatter the strings back.
+            distinct, inverse = np.unique(values[positive], return_inverse=True)
+            exponents = np.floor(np.log10(distinct))
+            with np.errstate(divide="ignore"):
+                mantissas = distinct / BerService._pow10(exponents)
+            formatted = np.array(
+                [
+                    f"{mantissa:.2f}E{exponent:+03d}"
+                    for mantissa, exponent in zip(mantissas.tolist(), exponents.astype(np.int64).tolist())
+                ],
+                dtype=object,
+            )
+            strings[positive] = formatted[inverse]
+        return strings
+
     @staticmethod
     def _format_ber_value(value: object) -> str:
         """Format BER values identically to legacy IB analysis output."""
@@ -653,10 +912,3 @@ class BerService:
         exponent = int(math.floor(math.log10(numeric)))
         mantissa = numeric / math.pow(10, exponent)
         return f"{mantissa:.2f}E{exponent:+03d}"
-
-    @staticmethod
-    def _max_severity(current: str, candidate: str) -> str:
-        order = {"unknown": 0, "normal": 1, "warning": 2, "critical": 3}
-        current = current or "normal"
-        candidate = candidate or "normal"
-        return candidate if order.get(candidate, 0) >= order.get(current, 0) else current
@@ -5,9 +5,42 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Dict, List
 
+import numpy as np
 import pandas as pd
 
 
+PORT_KEY = ["NodeGUID", "PortNumber"]
+# Columns of the brief table, in display order
+BRIEF_COLUMNS = [
+    "Index",
+    "NodeGUID",
+    "Node Name",
+    "Node Type",
+    "PortNumber",
+    "Attached To",
+    "Attached To Type",
+    "Attached To Port",
+    "Xmit Wait",
+    "Xmit Data",
+    "PortState",
+    "PortPhyState",
+    "NeighborPortState",
+    "NeighborPortPhyState",
+    "LinkDownedCounter",
+    "LinkErrorRecoveryCounter",
+    "Temperature (c)",
+    "Vendor",
+    "PN",
+    "FW",
+    "FWInfo_PSID",
+    "ActiveLinkWidth",
+    "SupportedLinkWidth",
+    "ActiveLinkSpeed",
+    "SupportedLinkSpeed",
+    "LinkComplianceStatus",
+]
+
+
 @dataclass
 class BriefResult:
     data: List[Dict[str, object]]
@@ -30,8 +63,7 @@ class BriefService:
         ber_rows: List[Dict[str, object]],
         hca_rows: List[Dict[str, object]],
     ) -> BriefResult:
-        xmit_df = pd.DataFrame(xmit_rows)
-        merged = xmit_df.copy()
+        merged = self._brief_frame(xmit_rows, PORT_KEY)
 
         # Ensure PortNumber is string type for consistent merging
         if "PortNumber" in merged.columns:
@@ -40,45 +72,28 @@ class BriefService:
         for rows in [cable_rows, ber_rows]:
             if not rows:
                 continue
-            df = pd.DataFrame(rows)
+            df = self._brief_frame(rows, PORT_KEY)
             # Ensure PortNumber is string type before merging
             if "PortNumber" in df.columns:
                 df["PortNumber"] = df["PortNumber"].astype(str)
-            merged = pd.merge(merged, df, on=["NodeGUID", "PortNumber"], how="left", suffixes=("", "_dup"))
+            merged = pd.merge(merged, df, on=PORT_KEY, how="left", suffixes=("", "_dup"))
 
         if hca_rows:
-            hca_df = pd.DataFrame(hca_rows)
+            hca_df = self._brief_frame(hca_rows, ["NodeGUID"])
             merged = pd.merge(merged, hca_df, on="NodeGUID", how="left", suffixes=("", "_hca"))
 
-        merged["Index"] = range(1, len(merged) + 1)
-        columns = [
-            "Index",
-            "NodeGUID",
-            "Node Name",
-            "Node Type",
-            "PortNumber",
-            "Attached To",
-            "Attached To Type",
-            "Attached To Port",
-            "Xmit Wait",
-            "Xmit Data",
-            "PortState",
-            "PortPhyState",
-             "NeighborPortState",
-             "NeighborPortPhyState",
-            "LinkDownedCounter",
-            "LinkErrorRecoveryCounter",
-            "Temperature (c)",
-            "Vendor",
-            "PN",
-            "FW",
-            "FWInfo_PSID",
-            "ActiveLinkWidth",
-            "SupportedLinkWidth",
-            "ActiveLinkSpeed",
-            "SupportedLinkSpeed",
-            "LinkComplianceStatus",
-        ]
-        existing_cols = [col for col in columns if col in merged.columns]
+        merged["Index"] = np.arange(1, len(merged) + 1)
+        existing_cols = [col for col in BRIEF_COLUMNS if col in merged.columns]
         brief_rows = merged[existing_cols].to_dict(orient="records")
         return BriefResult(data=brief_rows)
+
+    @staticmethod
+    def _brief_frame(rows: List[Dict[str, object]], key: List[str]) -> pd.DataFrame:
+        """Build a frame of only the join key and the brief columns the rows provide.
+
+        Other fields would only be dropped (or suffixed and dropped) after the
+        merges, so they are never turned into columns. "Index" is renumbered.
+        """
+        present = set().union(*rows)
+        columns = [col for col in dict.fromkeys([*key, *BRIEF_COLUMNS]) if col in present and col != "Index"]
+        return pd.DataFrame(rows, columns=columns)
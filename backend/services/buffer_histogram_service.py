@@ -9,14 +9,15 @@ Uses tables:
 from __future__ import annotations
 
 import logging
-from collections import defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 logger = logging.getLogger(__name__)
@@ -37,9 +38,9 @@ class BufferHistogramService:
     HIGH_UTILIZATION_THRESHOLD = 80  # Percentage
     CRITICAL_UTILIZATION_THRESHOLD = 95
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = dataset_root
-        self._index_cache: Optional[pd.DataFrame] = None
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._topology: Optional[TopologyLookup] = None
 
     def run(self) -> BufferHistogramResult:
@@ -52,94 +53,89 @@ class BufferHistogramService:
             return BufferHistogramResult()
 
         topology = self._get_topology()
-        records = []
+        row_count = len(buffer_data_df)
 
-        # Track statistics
-        high_utilization_count = 0
-        critical_utilization_count = 0
-        vl_distribution: Dict[int, int] = defaultdict(int)
-        buffer_type_distribution: Dict[str, int] = defaultdict(int)
-        max_utilization = 0.0
-        total_samples = 0
+        node_guids = self._text_column(buffer_data_df, ("NodeGuid", "NodeGUID"), "")
+        node_names = self._node_labels(topology, node_guids)
+        port_nums = self._int_column(self._first_column(buffer_data_df, ("PortNum", "PortNumber")), row_count)
+        vls = self._int_column(buffer_data_df.get("VL"), row_count)
+        buffer_types = self._text_column(buffer_data_df, ("BufferType", "Type"), "Unknown")
 
         # Get column names for dynamic analysis
         columns = list(buffer_data_df.columns)
         bin_columns = [c for c in columns if c.startswith("bin") or c.startswith("Bin")]
-
-        for _, row in buffer_data_df.iterrows():
-            node_guid = str(row.get("NodeGuid", row.get("NodeGUID", "")))
-            port_num = self._safe_int(row.get("PortNum", row.get("PortNumber", 0)))
-            vl = self._safe_int(row.get("VL", 0))
-
-            # Get node name
-            node_name = topology.node_label(node_guid) if topology else node_guid
-
-            # Buffer type
-            buffer_type = str(row.get("BufferType", row.get("Type", "Unknown")))
-            buffer_type_distribution[buffer_type] += 1
-
-            # Track VL distribution
-            vl_distribution[vl] += 1
-
-            # Extract bin values
-            bin_values = []
-            for col in bin_columns:
-                bin_values.append(self._safe_int(row.get(col, 0)))
-
-            # Calculate utilization metrics
-            total_count = sum(bin_values)
-            total_samples += total_count
-
-            # Higher bins indicate more congestion
-            if total_count > 0 and len(bin_values) > 0:
-                # Calculate weighted average (higher bins = more congestion)
-                weighted_sum = sum(i * v for i, v in enumerate(bin_values))
-                avg_bin = weighted_sum / total_count if total_count > 0 else 0
-                utilization_pct = (avg_bin / max(len(bin_values) - 1, 1)) * 100
-
-                # Count high bins (top 25% of bins)
-                high_bin_threshold = len(bin_values) * 3 // 4
-                high_bin_count = sum(bin_values[high_bin_threshold:])
-                high_bin_pct = (high_bin_count / total_count * 100) if total_count > 0 else 0
-            else:
-                utilization_pct = 0
-                high_bin_pct = 0
-                avg_bin = 0
-
-            max_utilization = max(max_utilization, utilization_pct)
-
-            # Determine severity
-            issues = []
-            severity = "normal"
-
-            if high_bin_pct >= self.CRITICAL_UTILIZATION_THRESHOLD:
-                issues.append(f"Critical buffer congestion: {high_bin_pct:.1f}% in high bins")
-                severity = "critical"
-                critical_utilization_count += 1
-            elif high_bin_pct >= self.HIGH_UTILIZATION_THRESHOLD:
-                issues.append(f"High buffer utilization: {high_bin_pct:.1f}% in high bins")
-                severity = "warning"
-                high_utilization_count += 1
-
-            record = {
-                "NodeGUID": node_guid,
-                "NodeName": node_name,
-                "PortNumber": port_num,
-                "VL": vl,
-                "BufferType": buffer_type,
-                "TotalSamples": total_count,
-                "AvgBin": round(avg_bin, 2),
-                "UtilizationPct": round(utilization_pct, 1),
-                "HighBinPct": round(high_bin_pct, 1),
-                "Severity": severity,
-                "Issues": "; ".join(issues) if issues else "",
+        bin_count = len(bin_columns)
+        # One row per entry, one column per bin, in the narrowest int dtype that holds
+        # every count; the reductions below accumulate in int64 regardless.
+        bins = (
+            np.column_stack([self._int_column(buffer_data_df[column], row_count) for column in bin_columns])
+            if bin_columns
+            else np.zeros((row_count, 0), dtype=np.int64)
+        )
+
+        # Calculate utilization metrics
+        total_counts = bins.sum(axis=1)
+        has_samples = total_counts > 0
+        divisor = np.where(has_samples, total_counts, 1)
+        # Higher bins indicate more congestion: weighted average bin index
+        avg_bin = (bins @ np.arange(bin_count, dtype=np.int64)) / divisor
+        utilization_pct = (avg_bin / max(bin_count - 1, 1)) * 100
+        # Count high bins (top 25% of bins)
+        high_bin_pct = bins[:, bin_count * 3 // 4 :].sum(axis=1) / divisor * 100
+        # Entries without samples report integer zeros, as before
+        avg_bin = np.where(has_samples, avg_bin, 0)
+        utilization_pct = np.where(has_samples, utilization_pct, 0)
+        high_bin_pct = np.where(has_samples, high_bin_pct, 0)
+
+        # Determine severity
+        critical = high_bin_pct >= self.CRITICAL_UTILIZATION_THRESHOLD
+        warning = ~critical & (high_bin_pct >= self.HIGH_UTILIZATION_THRESHOLD)
+        severity = np.where(critical, "critical", np.where(warning, "warning", "normal"))
+        high_bin_rounded = self._rounded(high_bin_pct, has_samples.tolist(), 1)
+
+        # Sort by severity and utilization, then build dicts only for the rows kept
+        severity_rank = np.select([critical, warning], [0, 1], 2).astype(np.int8)
+        kept = np.lexsort((-high_bin_rounded.to_numpy(dtype=float), severity_rank))[:2000]
+        samples = has_samples[kept].tolist()
+        issues = [
+            f"Critical buffer congestion: {pct:.1f}% in high bins"
+            if is_critical
+            else f"High buffer utilization: {pct:.1f}% in high bins"
+            if is_warning
+            else ""
+            for pct, is_critical, is_warning in zip(
+                high_bin_pct[kept].tolist(), critical[kept].tolist(), warning[kept].tolist()
+            )
+        ]
+        output = pd.DataFrame(
+            {
+                "NodeGUID": [node_guids[i] for i in kept],
+                "NodeName": pd.Series([node_names[i] for i in kept], dtype=object),
+                "PortNumber": port_nums[kept],
+                "VL": vls[kept],
+                "BufferType": [buffer_types[i] for i in kept],
+                "TotalSamples": total_counts[kept],
+                "AvgBin": self._rounded(avg_bin[kept], samples, 2),
+                "UtilizationPct": self._rounded(utilization_pct[kept], samples, 1),
+                "HighBinPct": high_bin_rounded.take(kept).reset_index(drop=True),
+                "Severity": severity[kept],
+                "Issues": issues,
+                # Add individual bin values for first 10 bins
+                **{f"Bin{i}": bins[kept, i] for i in range(min(bin_count, 10))},
             }
+        )
+        records = output.to_dict("records")
 
-            # Add individual bin values for first 10 bins
-            for i, val in enumerate(bin_values[:10]):
-                record[f"Bin{i}"] = val
-
-            records.append(record)
+        # Track statistics
+        type_codes, type_names = pd.factorize(pd.Series(buffer_types, dtype=object))
+        type_counts = np.bincount(type_codes, minlength=len(type_names)).tolist()
+        vl_values, vl_counts = np.unique(vls, return_counts=True)
+        total_samples = int(total_counts.sum())
+        max_utilization = max(0.0, float(utilization_pct.max()))
+        critical_utilization_count = int(critical.sum())
+        high_utilization_count = int(warning.sum())
+        vl_distribution = dict(zip(vl_values.tolist(), vl_counts.tolist()))
+        buffer_type_distribution = dict(zip(type_names.tolist(), type_counts))
 
         # Get histogram info summary
         histogram_config = {}
@@ -158,19 +154,13 @@ class BufferHistogramService:
             "high_utilization_count": high_utilization_count,
             "critical_utilization_count": critical_utilization_count,
             "max_utilization_pct": round(max_utilization, 1),
-            "vl_distribution": dict(sorted(vl_distribution.items())),
+            "vl_distribution": vl_distribution,
             "buffer_type_distribution": dict(sorted(buffer_type_distribution.items(), key=lambda x: -x[1])),
             "histogram_nodes_configured": len(histogram_config),
             "control_entries": len(buffer_control_df),
         }
 
-        # Sort by severity and utilization
-        records.sort(key=lambda r: (
-            0 if r["Severity"] == "critical" else 1 if r["Severity"] == "warning" else 2,
-            -r.get("HighBinPct", 0)
-        ))
-
-        return BufferHistogramResult(data=records[:2000], anomalies=None, summary=summary)
+        return BufferHistogramResult(data=records, anomalies=None, summary=summary)
 
     def _try_read_table(self, table_name: str) -> pd.DataFrame:
         try:
@@ -183,29 +173,66 @@ class BufferHistogramService:
             return pd.DataFrame()
 
     def _get_index_table(self) -> pd.DataFrame:
-        if self._index_cache is None:
-            db_csv = self._find_db_csv()
-            self._index_cache = read_index_table(db_csv)
-        return self._index_cache
+        """Index table, parsed once per dataset by the shared inventory."""
+        return self._inventory.index_table
 
     def _read_table(self, table_name: str) -> pd.DataFrame:
         db_csv = self._find_db_csv()
         return read_table(db_csv, table_name, self._get_index_table())
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        """db_csv path, globbed once per dataset by the shared inventory."""
+        return self._inventory.db_csv
 
     def _get_topology(self) -> Optional[TopologyLookup]:
         if self._topology is None:
             try:
-                self._topology = TopologyLookup(self.dataset_root)
+                self._topology = self._inventory.topology
             except Exception as e:
                 logger.debug(f"Could not load topology: {e}")
         return self._topology
 
+    @staticmethod
+    def _first_column(df: pd.DataFrame, names: Tuple[str, ...]) -> Optional[pd.Series]:
+        """The first of the alternative column names the table has, if any."""
+        for name in names:
+            if name in df.columns:
+                return df[name]
+        return None
+
+    @classmethod
+    def _text_column(cls, df: pd.DataFrame, names: Tuple[str, ...], default: str) -> List[str]:
+        series = cls._first_column(df, names)
+        if series is None:
+            return [default] * len(df)
+        return [str(value) for value in series.tolist()]
+
+    @staticmethod
+    def _node_labels(topology: Optional[TopologyLookup], node_guids: List[str]) -> List[object]:
+        if not topology:
+            return list(node_guids)
+        labels = {guid: topology.node_label(guid) for guid in dict.fromkeys(node_guids)}
+        return [labels[guid] for guid in node_guids]
+
+    @staticmethod
+    def _rounded(values: np.ndarray, present: List[bool], digits: int) -> pd.Series:
+        """round() each value, keeping the integer 0 of entries without samples."""
+        return pd.Series(
+            [round(value, digits) if flag else 0 for value, flag in zip(values.tolist(), present)], dtype=object
+        )
+
+    @staticmethod
+    def _int_column(series: Optional[pd.Series], length: int) -> np.ndarray:
+        """Column-wise equivalent of _safe_int, downcast to the smallest int dtype that fits.
+
+        A missing column is all zeros.
+        """
+        if series is None:
+            return np.zeros(length, dtype=np.int8)
+        values = np.trunc(pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan))
+        values[~np.isfinite(values)] = 0
+        return pd.to_numeric(values.astype(np.int64), downcast="integer")
+
     @staticmethod
     def _safe_int(value: object) -> int:
         try:
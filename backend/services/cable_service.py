@@ -24,6 +24,8 @@ CABLE_TABLE = "CABLE_INFO"
 TEMP_WARNING_THRESHOLD = 70
 TEMP_CRITICAL_THRESHOLD = 80
 LENGTH_BUCKETS = ["0-1m", "1-3m", "3-5m", "5-10m", "10-30m", "30-100m", ">100m", "Unknown"]
+# Right-closed upper edges (meters) for every LENGTH_BUCKETS entry but "Unknown"
+LENGTH_BUCKET_EDGES = [0, 1, 3, 5, 10, 30, 100, np.inf]
 SPEED_PRIORITY = [
     (0x800, ("HDR/NDR", 7)),
     (0x400, ("EDR/HDR100", 6)),
@@ -252,7 +254,12 @@ class CableService:
     def _alarm_weight(value) -> float:
         if value is None:
             return 0.0
-        text = str(value).strip()
+        return CableService._cached_alarm_text_weight(str(value).strip())
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _cached_alarm_text_weight(text: str) -> float:
+        """Alarm cells repeat a few encodings, so each distinct text is parsed once."""
         if not text:
             return 0.0
         token = text.split()[0]
@@ -364,7 +371,9 @@ class CableService:
             return "SMF length missing for HDR+ optic"
         return "OK"
 
-    def _speed_desc_priority(self, desc: str) -> int:
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _speed_desc_priority(desc: str) -> int:
         tokens = desc.lower()
         if any(token in tokens for token in ["ndr", "400g"]):
             return 8
@@ -566,14 +575,11 @@ class CableService:
             summary["dom_capable_count"] = int(df["DOMCapable"].apply(self._truthy_flag).sum())
 
         # Efficient length distribution calculation
-        length_buckets: Dict[str, int] = {}
-        for _, row in df.iterrows():
-            bucket = self._categorize_length_bucket(row)
-            length_buckets[bucket] = length_buckets.get(bucket, 0) + 1
+        length_buckets = self._categorize_length_buckets(df).value_counts()
         summary["length_distribution"] = {
-            bucket: length_buckets.get(bucket, 0)
-            for bucket in LENGTH_BUCKETS
-            if length_buckets.get(bucket, 0)
+            bucket: int(count)
+            for bucket, count in length_buckets.reindex(LENGTH_BUCKETS, fill_value=0).items()
+            if count
         }
 
         return summary
@@ -591,34 +597,15 @@ class CableService:
             return "optical"
         return ""
 
-    def _categorize_length_bucket(self, row) -> str:
-        value = None
+    def _categorize_length_buckets(self, df: pd.DataFrame) -> pd.Series:
+        """Bucket each cable by its first positive length column; missing lengths are "Unknown"."""
+        lengths = pd.Series(np.nan, index=df.index)
         for key in ("LengthCopperOrActive", "LengthSMFiber", "Length"):
-            if key in row:
-                candidate = row.get(key)
-                if pd.notna(candidate):
-                    try:
-                        numeric = float(candidate)
-                    except (TypeError, ValueError):
-                        continue
-                    if numeric > 0:
-                        value = numeric
-                        break
-        if value is None:
-            return "Unknown"
-        if value <= 1:
-            return "0-1m"
-        if value <= 3:
-            return "1-3m"
-        if value <= 5:
-            return "3-5m"
-        if value <= 10:
-            return "5-10m"
-        if value <= 30:
-            return "10-30m"
-        if value <= 100:
-            return "30-100m"
-        return ">100m"
+            if key in df.columns:
+                numeric = pd.to_numeric(df[key], errors="coerce")
+                lengths = lengths.where(lengths.notna() | ~(numeric > 0), numeric)
+        buckets = pd.cut(lengths, bins=LENGTH_BUCKET_EDGES, labels=LENGTH_BUCKETS[:-1])
+        return buckets.cat.add_categories(["Unknown"]).fillna("Unknown")
 
     @staticmethod
     def _truthy_flag(value: object) -> bool:
@@ -7,18 +7,20 @@ Uses tables:
 from __future__ import annotations
 
 import logging
-from collections import defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional
 
 import pandas as pd
 
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 logger = logging.getLogger(__name__)
 
+VL_COUNT = 16  # VL0-VL15
+
 
 @dataclass
 class CreditWatchdogResult:
@@ -31,9 +33,9 @@ class CreditWatchdogResult:
 class CreditWatchdogService:
     """Analyze credit watchdog timeout counters for flow control issues."""
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = dataset_root
-        self._index_cache: Optional[pd.DataFrame] = None
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._topology: Optional[TopologyLookup] = None
 
     def run(self) -> CreditWatchdogResult:
@@ -49,9 +51,17 @@ class CreditWatchdogService:
         # Track statistics
         total_timeouts = 0
         ports_with_timeouts = 0
-        vl_distribution: Dict[int, int] = defaultdict(int)
+        vl_distribution: List[int] = [0] * VL_COUNT
         max_timeout_count = 0
 
+        # Resolve each VL's counter column once; the first matching name wins
+        vl_columns = []
+        for vl in range(VL_COUNT):
+            for col in (f"VL{vl}TimeoutCount", f"VL{vl}_Timeout", f"VL{vl}"):
+                if col in cwd_df.columns:
+                    vl_columns.append((vl, col))
+                    break
+
         for _, row in cwd_df.iterrows():
             node_guid = str(row.get("NodeGuid", row.get("GUID", "")))
             port_num = self._safe_int(row.get("PortNum", row.get("PortNumber", 0)))
@@ -64,16 +74,12 @@ class CreditWatchdogService:
             total_port_timeouts = 0
 
             # Check for VL-specific counters
-            for vl in range(16):  # VL0-VL15
-                col_names = [f"VL{vl}TimeoutCount", f"VL{vl}_Timeout", f"VL{vl}"]
-                for col in col_names:
-                    if col in row.index:
-                        count = self._safe_int(row.get(col, 0))
-                        if count > 0:
-                            vl_timeouts[vl] = count
-                            total_port_timeouts += count
-                            vl_distribution[vl] += count
-                        break
+            for vl, col in vl_columns:
+                count = self._safe_int(row.get(col, 0))
+                if count > 0:
+                    vl_timeouts[vl] = count
+                    total_port_timeouts += count
+                    vl_distribution[vl] += count
 
             # Also check generic timeout counter
             generic_timeout = self._safe_int(row.get("TimeoutCount", row.get("Timeouts", 0)))
@@ -126,8 +132,8 @@ class CreditWatchdogService:
             "ports_with_timeouts": ports_with_timeouts,
             "total_timeout_events": total_timeouts,
             "max_timeout_count": max_timeout_count,
-            "vl_timeout_distribution": dict(sorted(vl_distribution.items())),
-            "affected_vls": len(vl_distribution),
+            "vl_timeout_distribution": {vl: count for vl, count in enumerate(vl_distribution) if count},
+            "affected_vls": sum(1 for count in vl_distribution if count),
         }
 
         # Sort by severity and timeout count
@@ -149,25 +155,19 @@ class CreditWatchdogService:
             return pd.DataFrame()
 
     def _get_index_table(self) -> pd.DataFrame:
-        if self._index_cache is None:
-            db_csv = self._find_db_csv()
-            self._index_cache = read_index_table(db_csv)
-        return self._index_cache
+        return self._inventory.index_table
 
     def _read_table(self, table_name: str) -> pd.DataFrame:
         db_csv = self._find_db_csv()
         return read_table(db_csv, table_name, self._get_index_table())
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        return self._inventory.db_csv
 
     def _get_topology(self) -> Optional[TopologyLookup]:
         if self._topology is None:
             try:
-                self._topology = TopologyLookup(self.dataset_root)
+                self._topology = self._inventory.topology
             except Exception as e:
                 logger.debug(f"Could not load topology: {e}")
         return self._topology
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import threading
 from pathlib import Path
 from typing import Optional
 
@@ -12,27 +13,37 @@ from .topology_lookup import TopologyLookup
 
 
 class DatasetInventory:
-    """Caches index tables, db_csv path, and topology lookup for services."""
+    """Caches index tables, db_csv path, and topology lookup for services.
+
+    One inventory may be shared by services running concurrently on the
+    analysis thread pool, so each lazy load happens at most once.
+    """
 
     def __init__(self, dataset_root: Path):
         self.dataset_root = dataset_root
         self._db_csv: Optional[Path] = None
         self._index_table: Optional[pd.DataFrame] = None
         self._topology: Optional[TopologyLookup] = None
+        self._lock = threading.RLock()
+        self._topology_lock = threading.Lock()
 
     @property
     def db_csv(self) -> Path:
         if self._db_csv is None:
-            matches = sorted(self.dataset_root.glob("*.db_csv"))
-            if not matches:
-                raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-            self._db_csv = matches[0]
+            with self._lock:
+                if self._db_csv is None:
+                    matches = sorted(self.dataset_root.glob("*.db_csv"))
+                    if not matches:
+                        raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
+                    self._db_csv = matches[0]
         return self._db_csv
 
     @property
     def index_table(self) -> pd.DataFrame:
         if self._index_table is None:
-            self._index_table = read_index_table(self.db_csv)
+            with self._lock:
+                if self._index_table is None:
+                    self._index_table = read_index_table(self.db_csv)
         return self._index_table
 
     def table_exists(self, table_name: str) -> bool:
@@ -46,5 +57,7 @@ class DatasetInventory:
     @property
     def topology(self) -> TopologyLookup:
         if self._topology is None:
-            self._topology = TopologyLookup(self.dataset_root)
+            with self._topology_lock:
+                if self._topology is None:
+                    self._topology = TopologyLookup(self.dataset_root, db_csv=self.db_csv)
         return self._topology
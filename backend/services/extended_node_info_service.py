@@ -15,7 +15,8 @@ from typing import Dict, List, Optional
 
 import pandas as pd
 
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 logger = logging.getLogger(__name__)
@@ -32,9 +33,9 @@ class ExtendedNodeInfoResult:
 class ExtendedNodeInfoService:
     """Analyze extended node information for additional device attributes."""
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = dataset_root
-        self._index_cache: Optional[pd.DataFrame] = None
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._topology: Optional[TopologyLookup] = None
 
     def run(self) -> ExtendedNodeInfoResult:
@@ -206,25 +207,19 @@ class ExtendedNodeInfoService:
             return pd.DataFrame()
 
     def _get_index_table(self) -> pd.DataFrame:
-        if self._index_cache is None:
-            db_csv = self._find_db_csv()
-            self._index_cache = read_index_table(db_csv)
-        return self._index_cache
+        return self._inventory.index_table
 
     def _read_table(self, table_name: str) -> pd.DataFrame:
         db_csv = self._find_db_csv()
         return read_table(db_csv, table_name, self._get_index_table())
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        return self._inventory.db_csv
 
     def _get_topology(self) -> Optional[TopologyLookup]:
         if self._topology is None:
             try:
-                self._topology = TopologyLookup(self.dataset_root)
+                self._topology = self._inventory.topology
             except Exception as e:
                 logger.debug(f"Could not load topology: {e}")
         return self._topology
@@ -9,7 +9,8 @@ from typing import Dict, List, Optional
 import pandas as pd
 
 from .anomalies import AnomlyType, IBH_ANOMALY_TBL_KEY
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 
@@ -41,10 +42,11 @@ class FanService:
     SPEED_TABLE = "FANS_SPEED"
     THRESHOLD_TABLE = "FANS_THRESHOLDS"
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = Path(dataset_root)
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._db_csv = self._find_db_csv()
-        self._index = read_index_table(self._db_csv)
+        self._index = self._inventory.index_table
         self._alerts: Optional[pd.DataFrame] = None
         self._speeds: Optional[pd.DataFrame] = None
         self._thresholds: Optional[pd.DataFrame] = None
@@ -183,14 +185,11 @@ class FanService:
 
     def _topology_lookup(self) -> TopologyLookup:
         if self._topology is None:
-            self._topology = TopologyLookup(self.dataset_root)
+            self._topology = self._inventory.topology
         return self._topology
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        return self._inventory.db_csv
 
     @staticmethod
     def _normalize_guid(value: object) -> str:
@@ -11,7 +11,8 @@ from typing import Dict, List
 import pandas as pd
 
 from .anomalies import AnomlyType, IBH_ANOMALY_TBL_KEY
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 logger = logging.getLogger(__name__)
@@ -23,8 +24,9 @@ RECENT_REBOOT_THRESHOLD_SECONDS = 60 * 60  # Flag hosts restarted within the las
 class HcaService:
     """Loads host adapters and evaluates firmware/PSID compliance."""
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = dataset_root
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._df: pd.DataFrame | None = None
         self.fw_matrix = self._load_fw_matrix()
         self._topology: TopologyLookup | None = None
@@ -57,9 +59,9 @@ class HcaService:
         if self._df is not None:
             return self._df
         db_csv = self._find_db_csv()
-        index_table = read_index_table(db_csv)
+        index_table = self._inventory.index_table
         df = read_table(db_csv, HCA_TABLE, index_table)
-        df["NodeGUID"] = df.apply(self._remove_redundant_zero, axis=1)
+        df["NodeGUID"] = TopologyLookup.normalize_guid_column(df["NodeGUID"])
         df["Device Type"] = df.apply(self._device_type, axis=1)
         df["FW Date"] = (
             df["FWInfo_Year"].astype(str).str[2:]
@@ -129,30 +131,7 @@ class HcaService:
             return "N/A"
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
-
-    @staticmethod
-    def _remove_redundant_zero(row) -> str:
-        """Remove redundant zeros from GUID. Can handle both dict/row and string."""
-        # Handle when called with a string value directly (from Series.apply)
-        if isinstance(row, str):
-            guid = row
-        # Handle when called with a dict/row object
-        elif isinstance(row, dict) or hasattr(row, "get"):
-            guid = str(row.get("NodeGUID", ""))
-        else:
-            guid = str(row)
-
-        if guid.startswith("0x"):
-            try:
-                return hex(int(guid, 16))
-            except (ValueError, OverflowError):
-                logger.warning(f"Invalid hex GUID format: {guid}")
-                return guid
-        return guid
+        return self._inventory.db_csv
 
     @staticmethod
     def _device_type(row):
@@ -256,7 +235,7 @@ class HcaService:
 
     def _topology_lookup(self) -> TopologyLookup:
         if self._topology is None:
-            self._topology = TopologyLookup(self.dataset_root)
+            self._topology = self._inventory.topology
         return self._topology
 
     @staticmethod
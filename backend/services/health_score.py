@@ -21,7 +21,7 @@ class Severity(Enum):
     INFO = "info"
 
 
-@dataclass
+@dataclass(slots=True)
 class Issue:
     severity: Severity
     category: str
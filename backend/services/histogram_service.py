@@ -9,7 +9,8 @@ from typing import Dict, List, Optional
 import pandas as pd
 
 from .anomalies import AnomlyType, IBH_ANOMALY_TBL_KEY
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 
@@ -23,8 +24,9 @@ class HistogramAnalysis:
 class HistogramService:
     TABLE = "PERFORMANCE_HISTOGRAM_PORTS_DATA"
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = Path(dataset_root)
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._df: Optional[pd.DataFrame] = None
         self._bin_columns: List[str] = []
         self._topology: Optional[TopologyLookup] = None
@@ -64,7 +66,7 @@ class HistogramService:
         if self._df is not None:
             return self._df
         db_csv = self._find_db_csv()
-        index_table = read_index_table(db_csv)
+        index_table = self._inventory.index_table
         if self.TABLE not in index_table.index:
             self._df = pd.DataFrame()
             return self._df
@@ -228,10 +230,7 @@ class HistogramService:
         return summary
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        return self._inventory.db_csv
 
     @staticmethod
     def _normalize_guid(value: object) -> str:
@@ -247,5 +246,5 @@ class HistogramService:
 
     def _topology_lookup(self) -> TopologyLookup:
         if self._topology is None:
-            self._topology = TopologyLookup(self.dataset_root)
+            self._topology = self._inventory.topology
         return self._topology
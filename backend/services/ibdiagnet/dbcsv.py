@@ -3,12 +3,19 @@
 from __future__ import annotations
 
 import re
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterable, Optional, Tuple
 
 import pandas as pd
 
-_INDEX_CACHE: Dict[Path, pd.DataFrame] = {}
+# resolved path -> ((st_mtime_ns, st_size), index table); a rewritten file is
+# re-indexed. Shared by every service in the process, least recently used first.
+_INDEX_CACHE: Dict[Path, Tuple[Tuple[int, int], pd.DataFrame]] = {}
+_INDEX_CACHE_SIZE = 16
+# Services run on thread pools; lookups, inserts and evictions happen under this
+# lock, while reading and parsing a file stay outside it.
+_INDEX_CACHE_LOCK = threading.Lock()
 
 
 def read_index_table(file_name: str | Path) -> pd.DataFrame:
@@ -18,40 +25,65 @@ def read_index_table(file_name: str | Path) -> pd.DataFrame:
     This replicates the functionality we previously imported from ib_analysis.
     """
     path = Path(file_name)
-    cached = _INDEX_CACHE.get(path)
-    if cached is not None:
-        return cached
+    try:
+        stat = path.stat()
+        key = path.resolve()
+    except OSError as exc:
+        raise FileNotFoundError(f"Cannot open {file_name}") from exc
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _INDEX_CACHE_LOCK:
+        cached = _INDEX_CACHE.pop(key, None)
+        if cached is not None:
+            # Re-insert to mark it most recently used; a stale entry is replaced below
+            _INDEX_CACHE[key] = cached
+            if cached[0] == stamp:
+                return cached[1]
 
     try:
-        text = path.read_text(encoding="latin-1")
+        # Decode the raw bytes (latin-1 maps them one to one) so that string
+        # offsets are also byte offsets into the file.
+        text = path.read_bytes().decode("latin-1")
     except OSError as exc:
         raise FileNotFoundError(f"Cannot open {file_name}") from exc
 
-    matches = re.findall(r"(\d+):(START|END)_([^\n]*)", _annotate_lines(text))
+    matches = re.findall(r"(\d+):(\d+):(START|END)_([^\n]*)", _annotate_lines(text))
     if not matches:
         raise ValueError(f"Index markers not found in {file_name}")
 
-    df = (
-        pd.DataFrame(matches, columns=["line", "edge", "name"])
-        .drop_duplicates(subset=["name", "edge"], keep="last")
-        .set_index(["name", "edge"])
-        .unstack(-1)["line"]
+    markers = pd.DataFrame(matches, columns=["line", "offset", "edge", "name"]).drop_duplicates(
+        subset=["name", "edge"], keep="last"
     )
+    df = markers.set_index(["name", "edge"]).unstack(-1)["line"]
     df.columns.name = None
     df = df[["START", "END"]].astype(float)
     df["LINES"] = df["END"] - df["START"] - 2
-    _INDEX_CACHE[path] = df
+    # Byte offset of each START_ line, so read_table can seek instead of re-scanning
+    starts = markers[markers["edge"] == "START"].set_index("name")["offset"]
+    df["OFFSET"] = starts.reindex(df.index).astype(float)
+    with _INDEX_CACHE_LOCK:
+        _INDEX_CACHE[key] = (stamp, df)
+        while len(_INDEX_CACHE) > _INDEX_CACHE_SIZE:
+            _INDEX_CACHE.pop(next(iter(_INDEX_CACHE)), None)
     return df
 
 
-def read_table(file_name: str | Path, table_name: str, index_table: pd.DataFrame) -> pd.DataFrame:
+def read_table(
+    file_name: str | Path,
+    table_name: str,
+    index_table: pd.DataFrame,
+    usecols: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
     """
     Slice a specific table from the consolidated ibdiagnet output.
+
+    ``usecols`` restricts parsing to the named columns; names the table does
+    not have are ignored.
     """
-    start, end = index_table.loc[table_name][["START", "END"]]
-    return pd.read_csv(
-        file_name,
-        skiprows=int(start) - 1,
+    entry = index_table.loc[table_name]
+    start, end = entry[["START", "END"]]
+    offset = entry.get("OFFSET")
+    wanted = frozenset(usecols) if usecols is not None else None
+    options = dict(
         nrows=int(end - start) - 2,
         encoding="latin-1",
         header=1,
@@ -59,12 +91,22 @@ def read_table(file_name: str | Path, table_name: str, index_table: pd.DataFrame
         low_memory=False,
         quotechar="\x07",
         na_values=["N/A", "ERR"],
+        usecols=wanted.__contains__ if wanted is not None else None,
     )
+    if offset is None or pd.isna(offset):
+        # Index tables built without offsets: skip the preceding lines instead
+        return pd.read_csv(file_name, skiprows=int(start) - 1, **options)
+    # Seek to the START_ line so only this table's bytes are read and tokenized
+    with open(file_name, "rb") as handle:
+        handle.seek(int(offset))
+        return pd.read_csv(handle, **options)
 
 
 def _annotate_lines(text: str) -> str:
     lines = []
-    for idx, line in enumerate(text.splitlines(), start=1):
+    offset = 0
+    for idx, line in enumerate(text.splitlines(keepends=True), start=1):
         if line.startswith(("START_", "END_")):
-            lines.append(f"{idx}:{line}\n")
+            lines.append(f"{idx}:{offset}:{line.splitlines()[0]}\n")
+        offset += len(line)
     return "".join(lines)
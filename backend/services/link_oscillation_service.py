@@ -230,7 +230,7 @@ class LinkOscillationService:
     def _get_topology(self) -> TopologyLookup:
         if self._topology is None:
             try:
-                self._topology = TopologyLookup(self.dataset_root)
+                self._topology = self._inventory.topology
             except Exception as exc:  # pragma: no cover - defensive
                 logger.warning("Failed to create topology lookup: %s", exc)
                 self._topology = None
@@ -15,15 +15,30 @@ import logging
 from collections import defaultdict
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
 
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 logger = logging.getLogger(__name__)
 
+# Alternate column names some ibdiagnet versions use, keyed by the name read here
+LANE_COLUMN_FALLBACKS = {
+    "NodeGuid": "GUID",
+    "PortNum": "PortNumber",
+    "LaneNum": "Lane",
+    "EyeHeight": "EyeHeightMV",
+    "EyeWidth": "EyeWidthPS",
+    "Errors": "LaneErrors",
+    "SNR_dB": "SNR",
+    "Jitter_ps": "Jitter",
+    "LinkTrainingStatus": "LTStatus",
+    "EQDone": "EqualizationDone",
+}
+
 
 @dataclass
 class PerLanePerformanceResult:
@@ -36,9 +51,9 @@ class PerLanePerformanceResult:
 class PerLanePerformanceService:
     """Analyze per-lane PCI and physical layer performance."""
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = dataset_root
-        self._index_cache: Optional[pd.DataFrame] = None
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._topology: Optional[TopologyLookup] = None
 
     def run(self) -> PerLanePerformanceResult:
@@ -68,10 +83,28 @@ class PerLanePerformanceService:
             # Group by port for aggregation
             port_lane_data: Dict[str, List[Dict]] = defaultdict(list)
 
-            for _, row in p_db4_df.iterrows():
-                node_guid = str(row.get("NodeGuid", row.get("GUID", "")))
-                port_num = self._safe_int(row.get("PortNum", row.get("PortNumber", 0)))
-                lane_num = self._safe_int(row.get("LaneNum", row.get("Lane", 0)))
+            # Common equalizer tap columns
+            tap_columns = [
+                "PreCursor", "MainCursor", "PostCursor",
+                "PreCursor1", "PreCursor2", "PreCursor3",
+                "PostCursor1", "PostCursor2", "PostCursor3",
+                "DFE_Tap1", "DFE_Tap2", "DFE_Tap3", "DFE_Tap4",
+                "DFE_Tap5", "DFE_Tap6", "DFE_Tap7", "DFE_Tap8",
+                "CTLE_Gain", "CTLE_Pole", "CTLE_Zero",
+                "VGA_Gain", "AGC_Gain",
+            ]
+            p_db4_columns = [
+                "NodeGuid", "PortNum", "LaneNum",
+                *tap_columns,
+                "EyeHeight", "EyeWidth", "EyeGrade",
+                "Errors", "BitErrors", "SymbolErrors",
+                "SNR_dB", "Jitter_ps", "LinkTrainingStatus", "EQDone",
+            ]
+
+            for row in self._iter_rows(p_db4_df, p_db4_columns):
+                node_guid = str(row.get("NodeGuid", ""))
+                port_num = self._safe_int(row.get("PortNum", 0))
+                lane_num = self._safe_int(row.get("LaneNum", 0))
                 port_key = f"{node_guid}:{port_num}"
                 ports_analyzed.add(port_key)
                 total_lanes += 1
@@ -80,19 +113,8 @@ class PerLanePerformanceService:
                 eq_taps = {}
                 eq_issues = []
 
-                # Common equalizer tap columns
-                tap_columns = [
-                    "PreCursor", "MainCursor", "PostCursor",
-                    "PreCursor1", "PreCursor2", "PreCursor3",
-                    "PostCursor1", "PostCursor2", "PostCursor3",
-                    "DFE_Tap1", "DFE_Tap2", "DFE_Tap3", "DFE_Tap4",
-                    "DFE_Tap5", "DFE_Tap6", "DFE_Tap7", "DFE_Tap8",
-                    "CTLE_Gain", "CTLE_Pole", "CTLE_Zero",
-                    "VGA_Gain", "AGC_Gain",
-                ]
-
                 for col in tap_columns:
-                    if col in row.index:
+                    if col in row:
                         val = self._safe_float(row.get(col, 0))
                         eq_taps[col] = val
                         # Check for out-of-range equalizer values
@@ -104,12 +126,12 @@ class PerLanePerformanceService:
                     lanes_with_eq_issues += 1
 
                 # Eye diagram metrics (if available)
-                eye_height = self._safe_float(row.get("EyeHeight", row.get("EyeHeightMV", 0)))
-                eye_width = self._safe_float(row.get("EyeWidth", row.get("EyeWidthPS", 0)))
+                eye_height = self._safe_float(row.get("EyeHeight", 0))
+                eye_width = self._safe_float(row.get("EyeWidth", 0))
                 eye_grade = str(row.get("EyeGrade", ""))
 
                 # Error counters
-                lane_errors = self._safe_int(row.get("Errors", row.get("LaneErrors", 0)))
+                lane_errors = self._safe_int(row.get("Errors", 0))
                 bit_errors = self._safe_int(row.get("BitErrors", 0))
                 symbol_errors = self._safe_int(row.get("SymbolErrors", 0))
 
@@ -118,12 +140,12 @@ class PerLanePerformanceService:
                     lanes_with_issues += 1
 
                 # Signal quality
-                snr_db = self._safe_float(row.get("SNR_dB", row.get("SNR", 0)))
-                jitter_ps = self._safe_float(row.get("Jitter_ps", row.get("Jitter", 0)))
+                snr_db = self._safe_float(row.get("SNR_dB", 0))
+                jitter_ps = self._safe_float(row.get("Jitter_ps", 0))
 
                 # Link training
-                link_training_status = str(row.get("LinkTrainingStatus", row.get("LTStatus", "")))
-                eq_done = self._safe_bool(row.get("EQDone", row.get("EqualizationDone", False)))
+                link_training_status = str(row.get("LinkTrainingStatus", ""))
+                eq_done = self._safe_bool(row.get("EQDone", False))
 
                 lane_data = {
                     "lane_num": lane_num,
@@ -222,10 +244,14 @@ class PerLanePerformanceService:
         elif not phy_db4_df.empty:
             port_lane_data: Dict[str, List[Dict]] = defaultdict(list)
 
-            for _, row in phy_db4_df.iterrows():
-                node_guid = str(row.get("NodeGuid", row.get("GUID", "")))
-                port_num = self._safe_int(row.get("PortNum", row.get("PortNumber", 0)))
-                lane_num = self._safe_int(row.get("LaneNum", row.get("Lane", 0)))
+            phy_db4_columns = [
+                "NodeGuid", "PortNum", "LaneNum", "Status", "SignalDetect", "CDRLock",
+            ]
+
+            for row in self._iter_rows(phy_db4_df, phy_db4_columns):
+                node_guid = str(row.get("NodeGuid", ""))
+                port_num = self._safe_int(row.get("PortNum", 0))
+                lane_num = self._safe_int(row.get("LaneNum", 0))
                 port_key = f"{node_guid}:{port_num}"
                 ports_analyzed.add(port_key)
                 total_lanes += 1
@@ -314,6 +340,25 @@ class PerLanePerformanceService:
 
         return PerLanePerformanceResult(data=records[:2000], anomalies=None, summary=summary)
 
+    @staticmethod
+    def _iter_rows(df: pd.DataFrame, columns: List[str]) -> Iterator[Dict[str, object]]:
+        """Yield each row as a plain dict of the given columns that the table has.
+
+        Columns missing under their canonical name are read from the alternate
+        name in LANE_COLUMN_FALLBACKS, so rows only ever carry canonical keys.
+        itertuples avoids the per-row Series that iterrows builds, and projecting
+        first keeps the wide lane tables from zipping every column.
+        """
+        sources: List[str] = []
+        names: List[str] = []
+        for column in columns:
+            source = column if column in df.columns else LANE_COLUMN_FALLBACKS.get(column)
+            if source in df.columns:
+                sources.append(source)
+                names.append(column)
+        for values in df[sources].itertuples(index=False, name=None):
+            yield dict(zip(names, values))
+
     def _try_read_table(self, table_name: str) -> pd.DataFrame:
         try:
             index_table = self._get_index_table()
@@ -325,25 +370,19 @@ class PerLanePerformanceService:
             return pd.DataFrame()
 
     def _get_index_table(self) -> pd.DataFrame:
-        if self._index_cache is None:
-            db_csv = self._find_db_csv()
-            self._index_cache = read_index_table(db_csv)
-        return self._index_cache
+        return self._inventory.index_table
 
     def _read_table(self, table_name: str) -> pd.DataFrame:
         db_csv = self._find_db_csv()
         return read_table(db_csv, table_name, self._get_index_table())
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        return self._inventory.db_csv
 
     def _get_topology(self) -> Optional[TopologyLookup]:
         if self._topology is None:
             try:
-                self._topology = TopologyLookup(self.dataset_root)
+                self._topology = self._inventory.topology
             except Exception as e:
                 logger.debug(f"Could not load topology: {e}")
         return self._topology
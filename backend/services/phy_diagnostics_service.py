@@ -12,9 +12,11 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 logger = logging.getLogger(__name__)
@@ -31,9 +33,9 @@ class PhyDiagnosticsResult:
 class PhyDiagnosticsService:
     """Analyze physical layer diagnostics for signal integrity."""
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = dataset_root
-        self._index_cache: Optional[pd.DataFrame] = None
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._topology: Optional[TopologyLookup] = None
 
     def run(self) -> PhyDiagnosticsResult:
@@ -44,66 +46,72 @@ class PhyDiagnosticsService:
             return PhyDiagnosticsResult()
 
         topology = self._get_topology()
-        records = []
 
         # Get column names for dynamic analysis
         columns = list(phy_df.columns)
         field_columns = [c for c in columns if c.startswith("field")]
 
-        for _, row in phy_df.iterrows():
-            node_guid = str(row.get("NodeGuid", ""))
-            port_guid = str(row.get("PortGuid", ""))
-            port_num = self._safe_int(row.get("PortNum"))
-            version = self._safe_int(row.get("Version", 0))
-
-            # Get node name
-            node_name = topology.node_label(node_guid) if topology else node_guid
-
-            # Extract key field values (first 20 fields are typically most important)
-            field_values = {}
-            for i, col in enumerate(field_columns[:20]):
-                field_values[f"Field{i}"] = self._safe_int(row.get(col, 0))
-
-            # Calculate a simple quality score based on field values
-            # Higher values in certain fields may indicate issues
-            non_zero_fields = sum(1 for v in field_values.values() if v != 0)
-
-            record = {
-                "NodeGUID": node_guid,
-                "NodeName": node_name,
-                "PortNumber": port_num,
-                "PortGUID": port_guid[-16:] if len(port_guid) > 16 else port_guid,
-                "Version": version,
+        row_count = len(phy_df)
+        node_guids = (
+            [str(value) for value in phy_df["NodeGuid"].tolist()]
+            if "NodeGuid" in phy_df.columns
+            else [""] * row_count
+        )
+        port_guids = (
+            [str(value) for value in phy_df["PortGuid"].tolist()]
+            if "PortGuid" in phy_df.columns
+            else [""] * row_count
+        )
+        node_names = [topology.node_label(guid) for guid in node_guids] if topology else node_guids
+
+        # Extract key field values (first 20 fields are typically most important)
+        field_values = {
+            f"Field{i}": self._int_column(phy_df[col])
+            for i, col in enumerate(field_columns[:20])
+        }
+
+        # Calculate a simple quality score based on field values
+        # Higher values in certain fields may indicate issues
+        non_zero_fields = np.zeros(row_count, dtype=np.int64)
+        for values in field_values.values():
+            non_zero_fields += values != 0
+
+        output = pd.DataFrame(
+            {
+                "NodeGUID": node_guids,
+                "NodeName": pd.Series(node_names, dtype=object),
+                "PortNumber": self._int_column(phy_df.get("PortNum"), row_count),
+                "PortGUID": [guid[-16:] for guid in port_guids],
+                "Version": self._int_column(phy_df.get("Version"), row_count),
                 "NonZeroFields": non_zero_fields,
                 **field_values,
             }
-            records.append(record)
+        )
+        records = output.head(2000).to_dict("records")
 
         # Build summary
-        summary = self._build_summary(records, phy_df, field_columns)
+        summary = self._build_summary(non_zero_fields, phy_df, field_columns)
 
-        return PhyDiagnosticsResult(data=records[:2000], anomalies=None, summary=summary)
+        return PhyDiagnosticsResult(data=records, anomalies=None, summary=summary)
 
     def _build_summary(
         self,
-        records: List[Dict],
+        non_zero_fields: np.ndarray,
         raw_df: pd.DataFrame,
         field_columns: List[str],
     ) -> Dict[str, object]:
         """Build summary statistics."""
-        if not records:
+        if not len(non_zero_fields):
             return {"total_ports": 0}
 
-        non_zero_counts = [r.get("NonZeroFields", 0) for r in records]
-        avg_non_zero = sum(non_zero_counts) / len(non_zero_counts) if non_zero_counts else 0
-        max_non_zero = max(non_zero_counts) if non_zero_counts else 0
+        avg_non_zero = int(non_zero_fields.sum()) / len(non_zero_fields)
 
         return {
             "total_ports": len(raw_df),
             "total_diagnostic_fields": len(field_columns),
             "avg_non_zero_fields": round(avg_non_zero, 1),
-            "max_non_zero_fields": max_non_zero,
-            "ports_with_data": sum(1 for r in records if r.get("NonZeroFields", 0) > 0),
+            "max_non_zero_fields": int(non_zero_fields.max()),
+            "ports_with_data": int((non_zero_fields > 0).sum()),
         }
 
     def _try_read_table(self, table_name: str) -> pd.DataFrame:
@@ -117,34 +125,28 @@ class PhyDiagnosticsService:
             return pd.DataFrame()
 
     def _get_index_table(self) -> pd.DataFrame:
-        if self._index_cache is None:
-            db_csv = self._find_db_csv()
-            self._index_cache = read_index_table(db_csv)
-        return self._index_cache
+        return self._inventory.index_table
 
     def _read_table(self, table_name: str) -> pd.DataFrame:
         db_csv = self._find_db_csv()
         return read_table(db_csv, table_name, self._get_index_table())
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        return self._inventory.db_csv
 
     def _get_topology(self) -> Optional[TopologyLookup]:
         if self._topology is None:
             try:
-                self._topology = TopologyLookup(self.dataset_root)
+                self._topology = self._inventory.topology
             except Exception as e:
                 logger.debug(f"Could not load topology: {e}")
         return self._topology
 
     @staticmethod
-    def _safe_int(value: object) -> int:
-        try:
-            if pd.isna(value):
-                return 0
-            return int(float(value))
-        except (TypeError, ValueError):
-            return 0
+    def _int_column(series: Optional[pd.Series], length: int = 0) -> np.ndarray:
+        """Truncate a column to int64, with unparseable cells as 0; a missing column is all zeros."""
+        if series is None:
+            return np.zeros(length, dtype=np.int64)
+        values = np.trunc(pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan))
+        values[~np.isfinite(values)] = 0
+        return values.astype(np.int64)
@@ -14,10 +14,12 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 
 from .anomalies import AnomlyType, IBH_ANOMALY_AGG_COL, IBH_ANOMALY_AGG_WEIGHT
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 logger = logging.getLogger(__name__)
@@ -39,9 +41,9 @@ class PmDeltaResult:
 class PmDeltaService:
     """Analyze performance counter deltas from ibdiagnet run."""
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = dataset_root
-        self._index_cache: Optional[pd.DataFrame] = None
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._topology: Optional[TopologyLookup] = None
 
     def run(self) -> PmDeltaResult:
@@ -52,155 +54,172 @@ class PmDeltaService:
             return PmDeltaResult()
 
         topology = self._get_topology()
-        records = []
-        anomaly_rows = []
-
-        for _, row in pm_df.iterrows():
-            node_guid = str(row.get("NodeGUID", ""))
-            port_num = self._safe_int(row.get("PortNumber"))
-
-            # Get node name
-            node_name = topology.node_label(node_guid) if topology else node_guid
-
-            # Extract key counters
-            xmit_data = self._safe_int(row.get("PortXmitDataExtended", 0))
-            rcv_data = self._safe_int(row.get("PortRcvDataExtended", 0))
-            xmit_pkts = self._safe_int(row.get("PortXmitPktsExtended", 0))
-            rcv_pkts = self._safe_int(row.get("PortRcvPktsExtended", 0))
-            xmit_wait = self._safe_int(row.get("PortXmitWaitExt", 0))
-
-            # FEC counters
-            fec_corrected = self._safe_int(row.get("PortFECCorrectedSymbolCounter", 0))
-            fec_correctable_blocks = self._safe_int(row.get("PortFECCorrectableBlockCounter", 0))
-            fec_uncorrectable = self._safe_int(row.get("PortFECUncorrectableBlockCounter", 0))
-
-            # Per-lane FEC
-            fec_lane0 = self._safe_int(row.get("FECCorrectedSymbolCounterLane[0]", 0))
-            fec_lane1 = self._safe_int(row.get("FECCorrectedSymbolCounterLane[1]", 0))
-            fec_lane2 = self._safe_int(row.get("FECCorrectedSymbolCounterLane[2]", 0))
-            fec_lane3 = self._safe_int(row.get("FECCorrectedSymbolCounterLane[3]", 0))
-
-            # Error counters
-            relay_errors = self._safe_int(row.get("PortRcvSwitchRelayErrorsExt", 0))
-            dlid_errors = self._safe_int(row.get("PortDLIDMappingErrors", 0))
-
-            # Skip ports with no activity
-            total_activity = xmit_data + rcv_data + fec_corrected + fec_uncorrectable
-            if total_activity == 0:
-                continue
-
-            # Determine severity
-            severity = "normal"
-            issues = []
-
-            if fec_uncorrectable >= FEC_UNCORRECTABLE_THRESHOLD:
-                severity = "critical"
-                issues.append(f"FEC uncorrectable blocks: {fec_uncorrectable}")
-
-            if fec_corrected >= FEC_CORRECTABLE_WARNING:
-                if severity == "normal":
-                    severity = "warning"
-                issues.append(f"High FEC corrections: {fec_corrected:,}")
-
-            if relay_errors > 0:
-                if severity == "normal":
-                    severity = "warning"
-                issues.append(f"Switch relay errors: {relay_errors}")
-
-            if dlid_errors > 0:
-                if severity == "normal":
-                    severity = "warning"
-                issues.append(f"DLID mapping errors: {dlid_errors}")
-
-            # Calculate data rates (approximate, assuming 1 second sample)
-            xmit_gb = xmit_data / (1024 ** 3) if xmit_data > 0 else 0
-            rcv_gb = rcv_data / (1024 ** 3) if rcv_data > 0 else 0
-
-            # Calculate FEC lane imbalance
-            lane_values = [fec_lane0, fec_lane1, fec_lane2, fec_lane3]
-            lane_max = max(lane_values) if lane_values else 0
-            lane_min = min(lane_values) if lane_values else 0
-            lane_imbalance = (lane_max - lane_min) / max(lane_max, 1) * 100 if lane_max > 0 else 0
-
-            record = {
-                "NodeGUID": node_guid,
-                "NodeName": node_name,
-                "PortNumber": port_num,
-                "XmitDataGB": round(xmit_gb, 3),
-                "RcvDataGB": round(rcv_gb, 3),
-                "XmitPkts": xmit_pkts,
-                "RcvPkts": rcv_pkts,
-                "XmitWait": xmit_wait,
+        row_count = len(pm_df)
+
+        def counter(column: str) -> np.ndarray:
+            return self._int_column(pm_df.get(column), row_count)
+
+        # Extract key counters
+        xmit_data = counter("PortXmitDataExtended")
+        rcv_data = counter("PortRcvDataExtended")
+        fec_corrected = counter("PortFECCorrectedSymbolCounter")
+        fec_uncorrectable = counter("PortFECUncorrectableBlockCounter")
+
+        # Skip ports with no activity
+        active = (xmit_data + rcv_data + fec_corrected + fec_uncorrectable) != 0
+        if not active.any():
+            return PmDeltaResult(anomalies=None, summary=self._build_summary(pd.DataFrame(), pm_df))
+
+        frame = pm_df.loc[active]
+        node_guids = (
+            [str(value) for value in frame["NodeGUID"].tolist()]
+            if "NodeGUID" in frame.columns
+            else [""] * len(frame)
+        )
+        node_names = [topology.node_label(guid) for guid in node_guids] if topology else node_guids
+        port_nums = self._int_column(frame.get("PortNumber"), len(frame))
+
+        xmit_data = xmit_data[active]
+        rcv_data = rcv_data[active]
+        fec_corrected = fec_corrected[active]
+        fec_uncorrectable = fec_uncorrectable[active]
+
+        # Per-lane FEC
+        fec_lanes = [
+            self._int_column(frame.get(f"FECCorrectedSymbolCounterLane[{lane}]"), len(frame))
+            for lane in range(4)
+        ]
+
+        # Error counters
+        relay_errors = self._int_column(frame.get("PortRcvSwitchRelayErrorsExt"), len(frame))
+        dlid_errors = self._int_column(frame.get("PortDLIDMappingErrors"), len(frame))
+
+        # Determine severity
+        fec_critical = fec_uncorrectable >= FEC_UNCORRECTABLE_THRESHOLD
+        fec_high = fec_corrected >= FEC_CORRECTABLE_WARNING
+        has_relay = relay_errors > 0
+        has_dlid = dlid_errors > 0
+        severity = np.where(
+            fec_critical, "critical", np.where(fec_high | has_relay | has_dlid, "warning", "normal")
+        )
+        issues = [
+            "; ".join(
+                message
+                for flagged, message in (
+                    (critical, f"FEC uncorrectable blocks: {uncorrectable}"),
+                    (high, f"High FEC corrections: {corrected:,}"),
+                    (relay, f"Switch relay errors: {relay_count}"),
+                    (dlid, f"DLID mapping errors: {dlid_count}"),
+                )
+                if flagged
+            )
+            if critical or high or relay or dlid
+            else ""
+            for critical, high, relay, dlid, uncorrectable, corrected, relay_count, dlid_count in zip(
+                fec_critical.tolist(),
+                fec_high.tolist(),
+                has_relay.tolist(),
+                has_dlid.tolist(),
+                fec_uncorrectable.tolist(),
+                fec_corrected.tolist(),
+                relay_errors.tolist(),
+                dlid_errors.tolist(),
+            )
+        ]
+
+        # Calculate data rates (approximate, assuming 1 second sample)
+        gib = 1024 ** 3
+        xmit_gb = [round(value / gib, 3) if value > 0 else 0 for value in xmit_data.tolist()]
+        rcv_gb = [round(value / gib, 3) if value > 0 else 0 for value in rcv_data.tolist()]
+
+        # Calculate FEC lane imbalance
+        lane_matrix = np.column_stack(fec_lanes)
+        lane_max = lane_matrix.max(axis=1).tolist()
+        lane_min = lane_matrix.min(axis=1).tolist()
+        lane_imbalance = [
+            round((high - low) / max(high, 1) * 100, 1) if high > 0 else 0
+            for high, low in zip(lane_max, lane_min)
+        ]
+
+        output = pd.DataFrame(
+            {
+                "NodeGUID": node_guids,
+                "NodeName": pd.Series(node_names, dtype=object),
+                "PortNumber": port_nums,
+                "XmitDataGB": xmit_gb,
+                "RcvDataGB": rcv_gb,
+                "XmitPkts": counter("PortXmitPktsExtended")[active],
+                "RcvPkts": counter("PortRcvPktsExtended")[active],
+                "XmitWait": counter("PortXmitWaitExt")[active],
                 "FECCorrected": fec_corrected,
-                "FECCorrectableBlocks": fec_correctable_blocks,
+                "FECCorrectableBlocks": counter("PortFECCorrectableBlockCounter")[active],
                 "FECUncorrectable": fec_uncorrectable,
-                "FECLane0": fec_lane0,
-                "FECLane1": fec_lane1,
-                "FECLane2": fec_lane2,
-                "FECLane3": fec_lane3,
-                "FECLaneImbalancePct": round(lane_imbalance, 1),
+                "FECLane0": fec_lanes[0],
+                "FECLane1": fec_lanes[1],
+                "FECLane2": fec_lanes[2],
+                "FECLane3": fec_lanes[3],
+                "FECLaneImbalancePct": lane_imbalance,
                 "RelayErrors": relay_errors,
                 "DLIDErrors": dlid_errors,
                 "Severity": severity,
-                "Issues": "; ".join(issues) if issues else "",
+                "Issues": issues,
             }
-            records.append(record)
-
-            # Track anomalies
-            if fec_uncorrectable >= FEC_UNCORRECTABLE_THRESHOLD:
-                anomaly_rows.append({
-                    "NodeGUID": node_guid,
-                    "PortNumber": port_num,
-                    IBH_ANOMALY_AGG_COL: str(AnomlyType.IBH_FEC_UNCORRECTABLE),
-                    IBH_ANOMALY_AGG_WEIGHT: 1.0,
-                })
-            if relay_errors > 0:
-                anomaly_rows.append({
-                    "NodeGUID": node_guid,
-                    "PortNumber": port_num,
-                    IBH_ANOMALY_AGG_COL: str(AnomlyType.IBH_RELAY_ERROR),
-                    IBH_ANOMALY_AGG_WEIGHT: 0.5,
-                })
-
+        )
+
+        # Track anomalies; a port's FEC row precedes its relay row, as before.
+        anomaly_parts = [
+            (fec_critical, str(AnomlyType.IBH_FEC_UNCORRECTABLE), 1.0),
+            (has_relay, str(AnomlyType.IBH_RELAY_ERROR), 0.5),
+        ]
+        anomaly_frames = [
+            pd.DataFrame(
+                {
+                    "NodeGUID": output["NodeGUID"][mask],
+                    "PortNumber": output["PortNumber"][mask],
+                    IBH_ANOMALY_AGG_COL: anomaly,
+                    IBH_ANOMALY_AGG_WEIGHT: weight,
+                }
+            )
+            for mask, anomaly, weight in anomaly_parts
+            if mask.any()
+        ]
         # Build anomaly DataFrame
-        anomalies = pd.DataFrame(anomaly_rows) if anomaly_rows else None
+        anomalies = (
+            pd.concat(anomaly_frames).sort_index(kind="stable").reset_index(drop=True)
+            if anomaly_frames
+            else None
+        )
 
         # Build summary
-        summary = self._build_summary(records, pm_df)
+        summary = self._build_summary(output, pm_df)
 
-        # Sort by severity and FEC uncorrectable
-        records.sort(key=lambda r: (
-            0 if r["Severity"] == "critical" else 1 if r["Severity"] == "warning" else 2,
-            -r.get("FECUncorrectable", 0),
-            -r.get("FECCorrected", 0)
-        ))
+        # Sort by severity and FEC uncorrectable (lexsort keys run last-to-first; stable)
+        severity_rank = np.select([severity == "critical", severity == "warning"], [0, 1], default=2)
+        order = np.lexsort((-fec_corrected, -fec_uncorrectable, severity_rank))
+        records = output.iloc[order[:2000]].to_dict("records")
 
-        return PmDeltaResult(data=records[:2000], anomalies=anomalies, summary=summary)
+        return PmDeltaResult(data=records, anomalies=anomalies, summary=summary)
 
-    def _build_summary(self, records: List[Dict], raw_df: pd.DataFrame) -> Dict[str, object]:
+    def _build_summary(self, records: pd.DataFrame, raw_df: pd.DataFrame) -> Dict[str, object]:
         """Build summary statistics."""
-        if not records:
+        if records.empty:
             return {"total_ports_with_activity": 0}
 
-        total_xmit = sum(r.get("XmitDataGB", 0) for r in records)
-        total_rcv = sum(r.get("RcvDataGB", 0) for r in records)
-        total_fec_corrected = sum(r.get("FECCorrected", 0) for r in records)
-        total_fec_uncorrectable = sum(r.get("FECUncorrectable", 0) for r in records)
-
-        critical_count = sum(1 for r in records if r.get("Severity") == "critical")
-        warning_count = sum(1 for r in records if r.get("Severity") == "warning")
+        total_xmit = sum(records["XmitDataGB"].tolist())
+        total_rcv = sum(records["RcvDataGB"].tolist())
+        severity = records["Severity"]
 
         return {
             "total_ports_sampled": len(raw_df),
             "ports_with_activity": len(records),
             "total_xmit_gb": round(total_xmit, 2),
             "total_rcv_gb": round(total_rcv, 2),
-            "total_fec_corrected": total_fec_corrected,
-            "total_fec_uncorrectable": total_fec_uncorrectable,
-            "critical_count": critical_count,
-            "warning_count": warning_count,
-            "ports_with_fec_activity": sum(1 for r in records if r.get("FECCorrected", 0) > 0),
-            "ports_with_errors": sum(1 for r in records if r.get("RelayErrors", 0) > 0 or r.get("DLIDErrors", 0) > 0),
+            "total_fec_corrected": sum(records["FECCorrected"].tolist()),
+            "total_fec_uncorrectable": sum(records["FECUncorrectable"].tolist()),
+            "critical_count": int((severity == "critical").sum()),
+            "warning_count": int((severity == "warning").sum()),
+            "ports_with_fec_activity": int((records["FECCorrected"] > 0).sum()),
+            "ports_with_errors": int(((records["RelayErrors"] > 0) | (records["DLIDErrors"] > 0)).sum()),
         }
 
     def _try_read_table(self, table_name: str) -> pd.DataFrame:
@@ -214,34 +233,28 @@ class PmDeltaService:
             return pd.DataFrame()
 
     def _get_index_table(self) -> pd.DataFrame:
-        if self._index_cache is None:
-            db_csv = self._find_db_csv()
-            self._index_cache = read_index_table(db_csv)
-        return self._index_cache
+        return self._inventory.index_table
 
     def _read_table(self, table_name: str) -> pd.DataFrame:
         db_csv = self._find_db_csv()
         return read_table(db_csv, table_name, self._get_index_table())
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        return self._inventory.db_csv
 
     def _get_topology(self) -> Optional[TopologyLookup]:
         if self._topology is None:
             try:
-                self._topology = TopologyLookup(self.dataset_root)
+                self._topology = self._inventory.topology
             except Exception as e:
                 logger.debug(f"Could not load topology: {e}")
         return self._topology
 
     @staticmethod
-    def _safe_int(value: object) -> int:
-        try:
-            if pd.isna(value):
-                return 0
-            return int(float(value))
-        except (TypeError, ValueError):
-            return 0
+    def _int_column(series: Optional[pd.Series], length: int) -> np.ndarray:
+        """Truncate a column to int64, with unparseable cells as 0; a missing column is all zeros."""
+        if series is None:
+            return np.zeros(length, dtype=np.int64)
+        values = np.trunc(pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan))
+        values[~np.isfinite(values)] = 0
+        return values.astype(np.int64)
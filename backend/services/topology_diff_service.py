@@ -10,7 +10,8 @@ from typing import Dict, List, Optional, Tuple
 import pandas as pd
 
 from .anomalies import IBH_ANOMALY_AGG_COL, IBH_ANOMALY_AGG_WEIGHT, AnomlyType
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 
 
 SPEED_PRIORITY = [
@@ -56,14 +57,20 @@ class ExpectedLink:
 class TopologyDiffService:
     """Runs expected topology validation if a baseline file is provided."""
 
-    def __init__(self, dataset_root: Path, expected_topology_file: Path):
+    def __init__(
+        self,
+        dataset_root: Path,
+        expected_topology_file: Path,
+        dataset_inventory: DatasetInventory | None = None,
+    ):
         self.dataset_root = Path(dataset_root)
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self.expected_topology_file = Path(expected_topology_file)
         if not self.expected_topology_file.exists():
             raise FileNotFoundError(self.expected_topology_file)
         self._expected_nodes, self._expected_links = self._load_expectations()
         self._db_csv = self._find_db_csv()
-        self._index = read_index_table(self._db_csv)
+        self._index = self._inventory.index_table
         self._ports_df: Optional[pd.DataFrame] = None
         self._links_df: Optional[pd.DataFrame] = None
         self._nodes_df: Optional[pd.DataFrame] = None
@@ -267,10 +274,7 @@ class TopologyDiffService:
         return df
 
     def _find_db_csv(self) -> Path:
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        return self._inventory.db_csv
 
     @staticmethod
     def _normalize_guid(value: object) -> Optional[str]:
@@ -4,23 +4,29 @@ from __future__ import annotations
 
 import logging
 import math
+import re
 from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from .ibdiagnet import read_index_table, read_table
 
 logger = logging.getLogger(__name__)
 
+HEX_DIGITS_RE = re.compile(r"^[0-9a-f]+$")
+HEX_GUID_RE = re.compile(r"0x[0-9a-fA-F]+")
+
 
 class TopologyLookup:
     """Provides node labels and neighbor information for a dataset."""
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, db_csv: Optional[Path] = None):
         self.dataset_root = Path(dataset_root)
-        self._db_csv = self._find_db_csv()
+        # Callers that already resolved the dataset file pass it in to skip the glob.
+        self._db_csv = db_csv or self._find_db_csv()
         self._index_table = read_index_table(self._db_csv)
         self._node_names: Optional[Dict[str, str]] = None
         self._node_types: Optional[Dict[str, str]] = None
@@ -153,12 +159,18 @@ class TopologyLookup:
         """Normalize GUID format with validation."""
         if value is None:
             return None
-        text = str(value).strip()
+        # The same GUIDs recur on every port of a node, so memoize on the text.
+        return TopologyLookup._cached_normalize_guid_text(str(value))
+
+    @staticmethod
+    @lru_cache(maxsize=10000)
+    def _cached_normalize_guid_text(value: str) -> Optional[str]:
+        """Cached body of _normalize_guid, keyed on the GUID text."""
+        text = value.strip()
         if not text or text.lower() == "na":
             return None
 
         # Validate GUID format (hex string with optional 0x prefix)
-        import re
         if text.lower().startswith("0x"):
             hex_part = text[2:]
             prefix = True
@@ -167,7 +179,7 @@ class TopologyLookup:
             prefix = False
 
         # Validate hex format
-        if not re.match(r'^[0-9a-f]+$', hex_part.lower()):
+        if not HEX_DIGITS_RE.match(hex_part.lower()):
             logger.warning(f"Invalid GUID format: {text}")
             return text.lower()
 
@@ -185,6 +197,38 @@ class TopologyLookup:
             logger.warning(f"Failed to normalize GUID: {text}")
         return text.lower()
 
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def remove_redundant_zero(guid: str) -> str:
+        """Strip redundant leading zeros from a "0x" GUID; other text passes through."""
+        if guid.startswith("0x"):
+            try:
+                return hex(int(guid, 16))
+            except (ValueError, OverflowError):
+                logger.warning(f"Invalid hex GUID format: {guid}")
+                return guid
+        return guid
+
+    @staticmethod
+    def normalize_guid_column(series: pd.Series) -> List[str]:
+        """Column-wise remove_redundant_zero: each distinct GUID is normalized once.
+
+        Missing cells keep their own str() spelling ("nan" vs "None").
+        """
+        codes, guids = pd.factorize(series)
+        texts = pd.Index([str(guid) for guid in guids.tolist()], dtype=object)
+        # hex(int(guid, 16)) of a plain "0x<hex>" GUID just drops the leading
+        # zeros and lowercases; other "0x" text keeps the int() round trip.
+        plain_hex = np.array([HEX_GUID_RE.fullmatch(text) is not None for text in texts], dtype=bool)
+        digits = texts.str[2:].str.lstrip("0").str.lower()
+        normalized = np.where(plain_hex, "0x" + digits.where(digits != "", "0"), texts).astype(object)
+        for code in np.flatnonzero(~plain_hex & texts.str.startswith("0x")).tolist():
+            normalized[code] = TopologyLookup.remove_redundant_zero(texts[code])
+        result = normalized.take(codes) if len(normalized) else np.empty(len(codes), dtype=object)
+        for position in np.flatnonzero(codes < 0).tolist():
+            result[position] = TopologyLookup.remove_redundant_zero(str(series.iat[position]))
+        return result.tolist()
+
     @staticmethod
     def _safe_port(value: object) -> Optional[int]:
         if value is None:
@@ -18,7 +18,8 @@ from typing import Dict, List, Optional, Set
 
 import pandas as pd
 
-from .ibdiagnet import read_index_table, read_table
+from .dataset_inventory import DatasetInventory
+from .ibdiagnet import read_table
 from .topology_lookup import TopologyLookup
 
 logger = logging.getLogger(__name__)
@@ -147,7 +148,7 @@ for p_table in P_DB_RETRIEVING_TABLES:
     }
 
 
-@dataclass
+@dataclass(slots=True)
 class WarningItem:
     """Single warning item from ibdiagnet."""
     table_name: str
@@ -186,9 +187,9 @@ class WarningsAnalysis:
 class WarningsService:
     """Parse all WARNING tables from ibdiagnet db_csv."""
 
-    def __init__(self, dataset_root: Path):
+    def __init__(self, dataset_root: Path, dataset_inventory: DatasetInventory | None = None):
         self.dataset_root = dataset_root
-        self._index_cache: Optional[pd.DataFrame] = None
+        self._inventory = dataset_inventory or DatasetInventory(self.dataset_root)
         self._topology: Optional[TopologyLookup] = None
 
     def run(self) -> WarningsAnalysis:
@@ -227,10 +228,7 @@ class WarningsService:
 
     def _get_index_table(self) -> pd.DataFrame:
         """Get the index table, cached."""
-        if self._index_cache is None:
-            db_csv = self._find_db_csv()
-            self._index_cache = read_index_table(db_csv)
-        return self._index_cache
+        return self._inventory.index_table
 
     def _read_table(self, table_name: str) -> pd.DataFrame:
         """Read a table from db_csv."""
@@ -239,10 +237,7 @@ class WarningsService:
 
     def _find_db_csv(self) -> Path:
         """Find the db_csv file."""
-        matches = sorted(self.dataset_root.glob("*.db_csv"))
-        if not matches:
-            raise FileNotFoundError(f"No .db_csv files under {self.dataset_root}")
-        return matches[0]
+        return self._inventory.db_csv
 
     def _parse_warning_table(
         self, df: pd.DataFrame, table_name: str, config: Dict
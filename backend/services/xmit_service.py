@@ -111,13 +111,20 @@ class XmitService:
         df = self._load_dataframe()
         anomalies = self._build_anomalies(df)
         summary = self._build_summary(df)
-        return XmitAnalysis(data=df.to_dict(orient="records"), anomalies=anomalies, summary=summary)
+        return XmitAnalysis(data=self._to_records(df), anomalies=anomalies, summary=summary)
+
+    @staticmethod
+    def _to_records(frame: pd.DataFrame) -> List[dict]:
+        """Same rows as frame.to_dict("records"), built from per-column tolist()."""
+        columns = list(frame.columns)
+        values = [frame[column].tolist() for column in columns]
+        return [dict(zip(columns, row)) for row in zip(*values)]
 
     def _load_dataframe(self) -> pd.DataFrame:
         if self._df is not None:
             return self._df
         df = self._inventory.read_table(XMIT_TABLE)
-        df["NodeGUID"] = df.apply(self._remove_redundant_zero, axis=1)
+        df["NodeGUID"] = TopologyLookup.normalize_guid_column(df["NodeGUID"]) if "NodeGUID" in df.columns else ""
         df["PortXmitWaitTotal"] = pd.to_numeric(df.get("PortXmitWaitExt", 0), errors="coerce").fillna(0)
         df["PortXmitDataTotal"] = pd.to_numeric(df.get("PortXmitDataExtended", 0), errors="coerce").fillna(0)
         tick_to_seconds = 4e-9
@@ -151,20 +158,6 @@ class XmitService:
         self._df = df
         return df
 
-    @staticmethod
-    def _remove_redundant_zero(row) -> str:
-        if isinstance(row, dict) or hasattr(row, "get"):
-            guid = str(row.get("NodeGUID", ""))
-        else:
-            guid = str(row)
-        if guid.startswith("0x"):
-            try:
-                return hex(int(guid, 16))
-            except (ValueError, OverflowError):
-                logger.warning(f"Invalid hex GUID format: {guid}")
-                return guid
-        return guid
-
     @staticmethod
     def _extract_duration(file_name: Path) -> float:
         pattern = "--pm_pause_time"
@@ -429,7 +422,7 @@ class XmitService:
             return self._ports_df
         ports = self._inventory.read_table("PORTS")
         ports.rename(columns={"NodeGuid": "NodeGUID", "PortNum": "PortNumber"}, inplace=True)
-        ports["NodeGUID"] = ports["NodeGUID"].apply(self._remove_redundant_zero)
+        ports["NodeGUID"] = TopologyLookup.normalize_guid_column(ports["NodeGUID"])
         self._ports_df = ports
         return self._ports_df
 
@@ -444,7 +437,7 @@ class XmitService:
             self._credit_df = pd.DataFrame()
             return self._credit_df
         df.rename(columns={"NodeGUID": "NodeGUID", "PortNumber": "PortNumber"}, inplace=True)
-        df["NodeGUID"] = df["NodeGUID"].apply(self._remove_redundant_zero)
+        df["NodeGUID"] = TopologyLookup.normalize_guid_column(df["NodeGUID"])
         df["PortNumber"] = pd.to_numeric(df["PortNumber"], errors="coerce")
         df["CreditWatchdogTimeout"] = pd.to_numeric(
             df.get("total_port_credit_watchdog_timeout", 0), errors="coerce"
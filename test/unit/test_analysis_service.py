@@ -0,0 +1,196 @@
+"""Unit tests for AnalysisService helpers."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.analysis_service import AnalysisService, _quantize_preview_rows
+from services.anomalies import (
+    IBH_ANOMALY_AGG_COL,
+    IBH_ANOMALY_AGG_WEIGHT,
+    AnomlyType,
+)
+
+
+@pytest.fixture
+def service():
+    return AnalysisService()
+
+
+@pytest.fixture
+def anomaly_frame():
+    return pd.DataFrame(
+        {
+            "NodeGUID": ["0xAB", "00ab", None, "", "zz"],
+            "PortNumber": [1, "2.7", None, " 3 ", "x"],
+            str(AnomlyType.IBH_HIGH_XMIT_WAIT): [1, "2.5", np.inf, 1, 0],
+            AnomlyType.IBH_PLAIN_UNB.value: [0, 0, 0, 0, "1"],
+            "Unrelated": [5, 5, 5, 5, 5],
+        }
+    )
+
+
+def _reference_index(service, records):
+    """Row-by-row (guid, port) index over flattened anomaly records."""
+    index = set()
+    for record in records:
+        guid = service._normalize_guid_token(record.get("NodeGUID"))
+        port = service._safe_port(record.get("PortNumber")) or None
+        if guid or port is not None:
+            index.add((guid, port))
+    return index
+
+
+def _reference_row_matches(service, row, index):
+    """Row-by-row anomaly index predicate."""
+    guid = service._extract_guid_from_row(row)
+    port = service._extract_port_from_row(row) or None
+    return (guid, port) in index or (guid, None) in index
+
+
+class TestFlattenAnomalies:
+    """Test flattening of per-port anomaly frames."""
+
+    def test_emits_one_row_per_positive_weight(self, service, anomaly_frame):
+        rows, _ = service._flatten_anomalies(anomaly_frame)
+
+        assert [row[IBH_ANOMALY_AGG_WEIGHT] for row in rows] == [1.0, 2.5, 1.0, 1.0]
+        assert rows[0] == {
+            "NodeGUID": "0xAB",
+            "PortNumber": 1,
+            IBH_ANOMALY_AGG_COL: AnomlyType.IBH_HIGH_XMIT_WAIT.value,
+            IBH_ANOMALY_AGG_WEIGHT: 1.0,
+        }
+        assert rows[1]["PortNumber"] == 2
+        assert rows[-1][IBH_ANOMALY_AGG_COL] == AnomlyType.IBH_PLAIN_UNB.value
+
+    def test_empty_inputs(self, service):
+        assert service._flatten_anomalies(None) == ([], set())
+        assert service._flatten_anomalies(pd.DataFrame()) == ([], set())
+        assert service._flatten_anomalies(pd.DataFrame({"NodeGUID": ["0x1"]})) == ([], set())
+
+
+class TestAnomalyIndex:
+    """Test anomaly index construction."""
+
+    def test_frame_index_matches_record_index(self, service, anomaly_frame):
+        records, index = service._flatten_anomalies(anomaly_frame)
+
+        assert index == _reference_index(service, records)
+        assert ("0xab", 1) in index
+        assert ("0xab", 2) in index
+        assert ("", 3) in index
+
+    def test_frame_index_without_port_column(self, service, anomaly_frame):
+        records, index = service._flatten_anomalies(anomaly_frame.drop(columns=["PortNumber"]))
+
+        assert index == _reference_index(service, records)
+
+    def test_batch_matching_agrees_with_row_predicate(self, service):
+        index = {("0xab", 1), ("0xcd", None), ("", 7)}
+        rows = [
+            {"NodeGUID": "0xab", "PortNumber": 1},
+            {"NodeGUID": "0xab", "PortNumber": 2},
+            {"NodeGUID": "00cd", "PortNumber": 9},
+            {"NodeGUID": "", "PortNumber": 7},
+            {"GUID": "0xAB", "Port": "1"},
+            {"NodeGUID": "0xab", "PortNumber": 0},
+        ]
+        expected = [row for row in rows if _reference_row_matches(service, row, index)]
+
+        assert list(service._iter_rows_matching_anomaly_index(rows, index)) == expected
+        assert len(expected) == 4
+
+
+class TestRowHasAnomalyMarkers:
+    """Test the heuristic used to pick issue rows without an anomaly index."""
+
+    @pytest.mark.parametrize(
+        "row, expected",
+        [
+            ({"NodeGUID": "0x1", "Severity": "normal", "LinkDownedCounter": 0}, False),
+            ({"NodeGUID": "0x1", "Severity": "critical"}, True),
+            ({"NodeGUID": "0x1", "LinkDownedCounter": 3}, True),
+            ({"NodeGUID": "0x1", "ErrorThreshold": 10}, False),
+            ({"NodeGUID": "0x1", "Issues": ""}, False),
+            ({"NodeGUID": "0x1", "Status": "Link Down"}, True),
+            ({"NodeGUID": "0x1", "Nested": {"error": 1}}, False),
+        ],
+    )
+    def test_markers(self, service, row, expected):
+        assert service._row_has_anomaly_markers(row) is expected
+
+
+class TestBerResultCache:
+    """Test reuse of the cached BER result across runs."""
+
+    def test_reuses_result_until_db_csv_changes(self, service, tmp_path, monkeypatch):
+        db_csv = tmp_path / "run.db_csv"
+        db_csv.write_text("START_NODES\nEND_NODES\n")
+        calls = []
+
+        def fake_run(name, target_dir):
+            calls.append(name)
+            return object()
+
+        monkeypatch.setattr(service, "_run_service", fake_run)
+
+        first = service._run_ber_service(tmp_path)
+        assert service._run_ber_service(tmp_path) is first
+        assert calls == ["ber"]
+
+        stat = db_csv.stat()
+        os.utime(db_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert service._run_ber_service(tmp_path) is not first
+        assert calls == ["ber", "ber"]
+
+
+class TestSanitize:
+    """Test JSON sanitization of payload values."""
+
+    def test_float_counters_survive_unchanged(self, service):
+        counters = pd.Series([123456789012345.0, 98765432.0, 1760672000.123])
+        payload = {"summary": {"total": counters.iloc[0]}, "rows": [{"PortXmitDataTotal": v} for v in counters]}
+
+        cleaned = service._sanitize(payload)
+
+        assert cleaned["summary"]["total"] == 123456789012345.0
+        assert [row["PortXmitDataTotal"] for row in cleaned["rows"]] == counters.tolist()
+        assert service._sanitize({"x": np.float64(np.nan), "y": np.inf}) == {"x": None, "y": None}
+
+    def test_preview_quantization_skips_integral_values(self):
+        rows = [{"Counter": 123456789012345.0, "Ratio": 0.123456789, "Name": "a", "Count": 3}]
+
+        _quantize_preview_rows(rows)
+
+        assert rows == [{"Counter": 123456789012345.0, "Ratio": 0.1234568, "Name": "a", "Count": 3}]
+
+
+class TestServiceTimings:
+    """Test persistence of per-service timing averages."""
+
+    def test_saves_atomically_and_reloads(self, tmp_path, monkeypatch):
+        timings_file = tmp_path / "cache" / "service_timings.json"
+        monkeypatch.setattr("services.analysis_service.SERVICE_TIMINGS_FILE", timings_file)
+        service = AnalysisService()
+        service._record_service_time("ber", 2.0)
+        service._record_service_time("ber", 4.0)
+
+        service._save_service_timings()
+
+        assert [path.name for path in timings_file.parent.iterdir()] == [timings_file.name]
+        assert AnalysisService()._load_service_timings() == pytest.approx({"ber": 2.6})
+
+    def test_persistence_disabled_without_file(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("services.analysis_service.SERVICE_TIMINGS_FILE", None)
+        monkeypatch.chdir(tmp_path)
+        service = AnalysisService()
+        service._record_service_time("ber", 2.0)
+
+        service._save_service_timings()
+
+        assert list(tmp_path.iterdir()) == []
+        assert AnalysisService()._load_service_timings() == {}
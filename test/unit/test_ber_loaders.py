@@ -0,0 +1,193 @@
+"""Unit tests for the BER loaders (net_dump_ext and PHY_DB16) and severities."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.ber_service import BerService
+
+NET_DUMP_EXT = """\
+# ibdiagnet2 net dump ext
+#CA : 0 : 9 : 0x9 : 9 : x : x : x : x : 9 : x : x : 1e-9 : 1e-9 : 1e-9
+
+CA : 0 : 1 : 0x0002c9030000000a : 5 : x : x : x : x : 7 : x : x : 1.5e-12 : 2e-15 : 1.50E-254 : 0 : 0 : "host01 HCA-1"
+   SW : 0 : 2 : 0x00000000000000ab : 6 : x : x : x : x : 12 : x : x : 1e-9 : 0 : 4E-10 : 3 : 1 : "sw01"
+SW : 0 : 3 : 0xab : 6 : x : x : x : x : 12 : x : x : bad : na : N/A
+SW : 0 : 4 : 0xab : 6 : x : x : x : x : 12 : x : x : 3e-8 :  : 2.0e-6 : 7
+CA : 0 : 5 : 0x1 : 5 : x : x : x : x : 7 : x : x : 1e-9
+CA : 0 : port : 0x1 : 5 : x : x : x : x : 7 : x : x : 1e-9 : 1e-9 : 1e-9
+HOST : 0 : 6 : 0x1 : 5 : x : x : x : x : 7 : x : x : 1e-9 : 1e-9 : 1e-9
+"""
+
+
+def _line_split_rows(text):
+    """The original per-line parser, reduced to the fields compared below."""
+    rows = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if not (stripped.startswith("CA") or stripped.startswith("SW")):
+            continue
+        parts = [part.strip() for part in stripped.split(":")]
+        if len(parts) < 15:
+            continue
+        try:
+            port_number = int(parts[2])
+        except ValueError:
+            continue
+        rows.append(
+            {
+                "PortNumber": port_number,
+                "Node Name": parts[17].strip('"') if len(parts) > 17 else parts[3],
+                "Attached To": parts[9],
+                "Raw BER": parts[12],
+                "Effective BER": parts[13],
+                "Symbol BER": parts[14],
+                "Symbol Err": BerService._parse_int_token(parts[15] if len(parts) > 15 else "0"),
+                "Effective Err": BerService._parse_int_token(parts[16] if len(parts) > 16 else "0"),
+            }
+        )
+    return rows
+
+
+@pytest.fixture
+def net_dump_service(tmp_path):
+    (tmp_path / "ibdiagnet2.net_dump_ext").write_text(NET_DUMP_EXT, encoding="latin-1")
+    return BerService(tmp_path)
+
+
+class TestParseNetDumpFile:
+    """Test the read_csv based net_dump_ext parser."""
+
+    def test_matches_line_split_parser(self, net_dump_service):
+        df = net_dump_service._parse_net_dump_file()
+
+        expected = _line_split_rows(NET_DUMP_EXT)
+        assert df[list(expected[0])].to_dict("records") == expected
+        assert df["PortNumber"].tolist() == [1, 2, 3, 4]
+        assert df["Node Name"].tolist() == ["host01 HCA-1", "sw01", "0xab", "0xab"]
+
+    def test_ber_values(self, net_dump_service):
+        df = net_dump_service._ensure_numeric_ber_columns(net_dump_service._parse_net_dump_file())
+
+        np.testing.assert_array_equal(df["RawBERValue"], [1.5e-12, 1e-9, np.nan, 3e-8])
+        np.testing.assert_array_equal(df["EffectiveBERValue"], [2e-15, 0.0, np.nan, np.nan])
+        np.testing.assert_array_equal(df["SymbolBERValue"], [1.5e-254, 4e-10, np.nan, 2e-6])
+        np.testing.assert_array_equal(df["Log10 Raw BER"], np.log10([1.5e-12, 1e-9, np.nan, 3e-8]))
+
+    def test_missing_file(self, tmp_path):
+        assert BerService(tmp_path)._parse_net_dump_file().empty
+
+
+# NodeGuid, PortNum, then (mantissa, exponent) for the raw, effective and symbol BER
+PHY_DB16_ROWS = [
+    ("0x0002c9030000000A", 1, (15, 13), (2, 15), (15, 255)),  # symbol BER is the sentinel
+    ("0x2", 2, (0, 0), (0, 0), (0, 0)),  # every mantissa zero: no BER at all
+    ("0x3", 3, (5, "N/A"), (0, 0), (4, 10)),  # NaN exponent
+    ("0x4", 4, (3, 4294967295), (0, 0), (0, 0)),  # placeholder exponent
+    ("0x5", 5, (0, 0), (0, 0), (7, 9)),
+    ("0x6", 6, (0, 0), (1, ""), (0, 0)),  # missing exponent
+]
+BER_COLUMNS = [
+    ("Raw BER", "RawBERValue", "Log10 Raw BER"),
+    ("Effective BER", "EffectiveBERValue", "Log10 Effective BER"),
+    ("Symbol BER", "SymbolBERValue", "Log10 Symbol BER"),
+]
+
+
+@pytest.fixture
+def phy_db16_service(tmp_path):
+    lines = ["START_PHY_DB16", "NodeGuid,PortNum,field12,field13,field14,field15,field16,field17"]
+    for guid, port, *pairs in PHY_DB16_ROWS:
+        lines.append(",".join([guid, str(port), *(str(item) for pair in pairs for item in pair)]))
+    lines.append("END_PHY_DB16")
+    (tmp_path / "ibdiagnet2.db_csv").write_text("\n".join(lines) + "\n")
+    return BerService(tmp_path)
+
+
+def _as_float(value):
+    return np.nan if value in ("", "N/A") else float(value)
+
+
+class TestLoadPhyDb16:
+    """Test the column-wise PHY_DB16 loader against the scalar helpers."""
+
+    def test_drops_rows_without_ber(self, phy_db16_service):
+        df = phy_db16_service._load_phy_db16_dataframe()
+
+        assert df["PortNumber"].tolist() == [1, 3, 4, 5, 6]
+        assert df["NodeGUID"].tolist() == ["0x2c9030000000a", "0x3", "0x4", "0x5", "0x6"]
+
+    def test_matches_scalar_conversion(self, phy_db16_service):
+        df = phy_db16_service._load_phy_db16_dataframe()
+        kept = [row for row in PHY_DB16_ROWS if row[1] != 2]
+
+        for index, (string_col, value_col, log_col) in enumerate(BER_COLUMNS):
+            values = [
+                BerService._mantissa_exponent_to_value(_as_float(row[2 + index][0]), _as_float(row[2 + index][1]))
+                for row in kept
+            ]
+            strings = [None if value is None else BerService._format_ber_value(value) for value in values]
+            logs = [BerService._safe_log10(value) for value in values]
+            assert df[string_col].astype(object).where(df[string_col].notna(), None).tolist() == strings
+            np.testing.assert_array_equal(df[value_col].astype(float), [np.nan if v is None else v for v in values])
+            np.testing.assert_array_equal(df[log_col].astype(float), [np.nan if v is None else v for v in logs])
+
+    def test_formatted_strings(self, phy_db16_service):
+        df = phy_db16_service._load_phy_db16_dataframe().fillna("missing")
+
+        assert df["Raw BER"].tolist() == ["1.50E-12", "N/A", "missing", "missing", "missing"]
+        assert df["Effective BER"].tolist() == ["2.00E-15", "missing", "missing", "missing", "N/A"]
+        assert df["Symbol BER"].tolist() == ["1.50E-254", "4.00E-10", "missing", "7.00E-09", "missing"]
+        assert df.loc[0, "Log10 Raw BER"] == pytest.approx(-11.823908740944319)
+        assert df["SymbolBERLog10Value"].tolist()[0] == df["Log10 Symbol BER"].tolist()[0]
+
+
+class TestBerSeverity:
+    """Test the SymbolBERSeverity annotation."""
+
+    @pytest.mark.parametrize(
+        "text, log_value, symbol_err, ber_warning, expected",
+        [
+            ("1.50E-254", np.log10(1.5e-254), 0, False, "normal"),
+            ("1.50e-254", np.nan, 0, False, "normal"),
+            ("4.00E-10", np.log10(4e-10), 0, False, "warning"),
+            (None, -9.0, 0, False, "warning"),
+            (None, np.nan, 0, False, "normal"),
+            ("", np.nan, 0, False, "normal"),
+            ("garbage", np.nan, 0, False, "warning"),
+            ("1.50E-254", np.nan, 2, False, "critical"),
+            ("1.50E-254", np.nan, 0, True, "warning"),
+            ("4.00E-10", np.nan, 3, True, "critical"),
+        ],
+    )
+    def test_symbol_ber_severity(self, tmp_path, text, log_value, symbol_err, ber_warning, expected):
+        df = pd.DataFrame(
+            {
+                "Symbol BER": pd.Series([text], dtype=object),
+                "SymbolBERLog10Value": [log_value],
+                "Symbol Err": [symbol_err],
+                "Effective Err": [0],
+                "BerWarning": [ber_warning],
+            }
+        )
+
+        BerService(tmp_path)._annotate_symbol_ber(df)
+
+        assert df["SymbolBERSeverity"].astype(str).tolist() == [expected]
+
+    def test_raw_effective_escalation_keeps_lower_severities(self, tmp_path):
+        df = pd.DataFrame(
+            {
+                "SymbolBERSeverity": ["info", "info", "info", "critical", "warning"],
+                "Symbol Err": [0, 0, 5, 0, "bad"],
+                "Effective Err": [0, 0, 0, 0, None],
+                "BerWarning": [False, True, False, True, False],
+            }
+        )
+
+        BerService(tmp_path)._annotate_raw_effective_ber(df)
+
+        assert df["SymbolBERSeverity"].astype(str).tolist() == ["info", "warning", "critical", "critical", "warning"]
+        assert df["Symbol Err"].tolist() == [0, 0, 5, 0, 0]
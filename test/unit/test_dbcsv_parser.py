@@ -121,6 +121,78 @@ class TestDbCsvParser:
             # but we can verify the dataframe was created successfully)
             assert isinstance(df, pd.DataFrame)
 
+    def test_read_table_usecols_projection(self, tmp_path):
+        """Test that usecols keeps only the requested columns and ignores unknown names."""
+        db_csv_file = tmp_path / "projection.db_csv"
+        db_csv_file.write_text(
+            "START_PHY_DB16\n"
+            "NodeGuid,PortNum,field12,field13\n"
+            "0x1,1,5,12\n"
+            "0x2,2,0,0\n"
+            "END_PHY_DB16\n"
+        )
+        index_df = read_index_table(db_csv_file)
+
+        df = read_table(db_csv_file, "PHY_DB16", index_df, usecols=["NodeGuid", "field12", "Missing"])
+
+        assert list(df.columns) == ["NodeGuid", "field12"]
+        assert df["field12"].tolist() == [5, 0]
+
+    def test_read_table_seeks_to_table_offset(self, tmp_path):
+        """Test that tables are read from their START_ byte offset, with or without CRLF."""
+        db_csv_file = tmp_path / "offsets.db_csv"
+        db_csv_file.write_bytes(
+            b"START_NODES\r\nNodeGUID,NodeDesc\r\n0x1,caf\xe9\r\nEND_NODES\r\n\r\n"
+            b"START_PM_DELTA\r\nNodeGUID,PortNumber\r\n0x1,1\r\n0x1,2\r\nEND_PM_DELTA\r\n"
+        )
+        index_df = read_index_table(db_csv_file)
+
+        assert index_df.loc["NODES", "OFFSET"] == 0
+        assert index_df.loc["PM_DELTA", "OFFSET"] == db_csv_file.read_bytes().index(b"START_PM_DELTA")
+
+        pm_df = read_table(db_csv_file, "PM_DELTA", index_df)
+        assert pm_df["PortNumber"].tolist() == [1, 2]
+        # Index tables without offsets still fall back to skipping lines
+        legacy = read_table(db_csv_file, "PM_DELTA", index_df.drop(columns=["OFFSET"]))
+        pd.testing.assert_frame_equal(pm_df, legacy)
+        assert read_table(db_csv_file, "NODES", index_df)["NodeDesc"].tolist() == ["café"]
+
+    def test_read_index_table_reindexes_rewritten_file(self, tmp_path):
+        """Test that the index cache is keyed on the file's mtime and size."""
+        db_csv_file = tmp_path / "rewritten.db_csv"
+        db_csv_file.write_text("START_NODES\nNodeGUID\n0x1\nEND_NODES\n")
+        first = read_index_table(db_csv_file)
+        assert read_index_table(db_csv_file) is first
+
+        db_csv_file.write_text("START_NODES\nNodeGUID\n0x1\n0x2\nEND_NODES\n")
+        second = read_index_table(db_csv_file)
+
+        assert second is not first
+        assert second.loc["NODES", "LINES"] == 2
+
+    def test_read_index_table_shares_cache_across_path_spellings(self, tmp_path, monkeypatch):
+        """Test that relative and absolute paths to one file hit the same cache entry."""
+        db_csv_file = tmp_path / "shared.db_csv"
+        db_csv_file.write_text("START_NODES\nNodeGUID\n0x1\nEND_NODES\n")
+        monkeypatch.chdir(tmp_path)
+
+        assert read_index_table("shared.db_csv") is read_index_table(db_csv_file)
+
+    def test_read_index_table_concurrent_eviction(self, tmp_path):
+        """Test that threads reading more files than the cache holds never fail."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        files = []
+        for idx in range(40):
+            db_csv_file = tmp_path / f"many_{idx}.db_csv"
+            db_csv_file.write_text(f"START_NODES\nNodeGUID\n0x{idx + 1}\nEND_NODES\n")
+            files.append(db_csv_file)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(read_index_table, files * 5))
+
+        assert all(df.loc["NODES", "LINES"] == 1 for df in results)
+
     def test_read_table_encoding_latin1(self, db_csv_file):
         """Test that latin-1 encoding is handled correctly."""
         index_df = read_index_table(db_csv_file)
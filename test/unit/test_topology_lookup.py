@@ -150,6 +150,18 @@ class TestTopologyEdgeCases:
         # Should handle long names
         assert len(long_name) == 1000
 
+    def test_normalize_guid_column_matches_scalar(self):
+        """Test the column-wise GUID normalizer against the scalar helper."""
+        values = ["0x000E8EBD3", "0xE8EBD3", "0x0", "0x", "0xzz", "0x_1", "e8ebd3", "", None, float("nan")]
+        series = pd.Series(values * 2, dtype=object)
+
+        result = TopologyLookup.normalize_guid_column(series)
+
+        assert result == [TopologyLookup.remove_redundant_zero(str(value)) for value in values * 2]
+        assert result[:4] == ["0xe8ebd3", "0xe8ebd3", "0x0", "0x"]
+        assert result[8:10] == ["None", "nan"]
+        assert TopologyLookup.normalize_guid_column(pd.Series([], dtype=object)) == []
+
 
 class TestTopologyIntegration:
     """Integration tests for topology lookup."""